@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+'''
+Benchmarks for the COB server routes.
+
+Generates synthetic stand-ins for the Camoco datasets (see synthetic.py) at
+several sizes, loads `cob.server` against them and drives the routes through
+the Flask test client, reporting latency, throughput and peak memory per route
+and size. Save a run with `--json` and compare a later one against it with
+`--compare`:
+
+    $ python benchmarks/bench_server.py --sizes 1k 5k --json before.json
+    $ python benchmarks/bench_server.py --sizes 1k 5k --compare before.json
+'''
+
+import os
+import sys
+import json
+import time
+import yaml
+import shutil
+import argparse
+import functools
+import importlib
+import tempfile
+import tracemalloc
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import synthetic
+
+# Dataset sizes as (genes, terms)
+SIZES = {
+    '1k': (1000, 10),
+    '5k': (5000, 100),
+    '10k': (10000, 1000),
+    '20k': (20000, 5000),
+    '40k': (40000, 10000),
+}
+
+# Server configuration, the same defaults the cob launcher uses
+CONF = {
+    'name': 'bench',
+    'networks': [],
+    'gwas': [],
+    'dev': False,
+    'workers': 1,
+    'workerClass': 'gthread',
+    'preload': False,
+    'maxRequests': 0,
+    'maxRequestsJitter': 0,
+    'keepalive': 2,
+    'requestLog': '',
+    'warmTerms': 0,
+    'compareWorkers': 2,
+    'heavyLimit': 4,
+    'heavyQueue': 8,
+    'heavyTimeout': 30,
+    'reloadInterval': 0,
+    'adminToken': '',
+    'camocoDir': '',
+    'profileStartup': False,
+    'profileDump': False,
+    'termStats': '',
+    'cacheSize': 32,
+    'degreeCutoffs': [1.0, 1.5, 2.0, 2.5, 3.0, 3.5, 4.0, 5.0],
+    'adjacencyCutoff': 2.0,
+    'adjacencyMmap': True,
+    'refLinks': {},
+    'defaults': {
+        'overlapMethod': 'density',
+        'overlapSNPs': 'strongest',
+        'logSpacing': True,
+        'hpo': False,
+        'visEnrich': True,
+        'fdrFilter': True,
+        'nodeCutoff': 0,
+        'edgeCutoff': 2.5,
+        'fdrCutoff': 0.35,
+        'windowSize': 50000,
+        'flankLimit': 2,
+        'visNeighbors': 25,
+        'nodeSize': 10,
+        'pCutoff': 0.05,
+        'minTerm': 5,
+        'maxTerm': 300
+    }
+}
+
+
+# Import a fresh copy of the server against the installed datasets
+def load_server(scratch):
+    conf = dict(CONF, scratch=scratch)
+    os.environ['COB_CONF'] = yaml.dump(conf)
+    sys.modules.pop('cob.server', None)
+    return importlib.import_module('cob.server')
+
+
+# Build the requests to make for each route, cycled through while timing
+def workloads(server, data, rng, num=20):
+    dflt = CONF['defaults']
+    net = next(iter(data.networks.values()))
+    gwas = next(iter(data.gwas.values()))
+    ids = net._expr.index.values
+    terms = [t.id for t in gwas.iter_terms()]
+    term_form = {
+        'network': net.name,
+        'ontology': gwas.name,
+        'nodeCutoff': dflt['nodeCutoff'],
+        'edgeCutoff': dflt['edgeCutoff'],
+        'windowSize': dflt['windowSize'],
+        'flankLimit': dflt['flankLimit'],
+        'fdrCutoff': dflt['fdrCutoff'],
+        'hpo': 'false',
+        'overlapSNPs': dflt['overlapSNPs'],
+        'overlapMethod': dflt['overlapMethod'],
+    }
+
+    def pick(k):
+        return list(rng.choice(ids, size=min(k, len(ids)), replace=False))
+
+    def term(i, **kwargs):
+        return dict(term_form, term=terms[i % len(terms)], **kwargs)
+
+    sets = [pick(1000) for i in range(4)]
+
+    work = {
+        'term_network': [('post', '/term_network', term(i))
+                         for i in range(num)],
+        'term_network (hpo)': [('post', '/term_network',
+                                term(i, hpo='true')) for i in range(num)],
+        'custom_network': [('post', '/custom_network', {
+            'network': net.name,
+            'nodeCutoff': dflt['nodeCutoff'],
+            'edgeCutoff': dflt['edgeCutoff'],
+            'visNeighbors': dflt['visNeighbors'],
+            'geneList': ', '.join(pick(20))
+        }) for i in range(num)],
+        'gene_connections': [],
+        'available_terms': [('get', '/available_terms/{}/{}'.format(
+            net.name, gwas.name), None)],
+    }
+    work['edge_cutoff'] = []
+    for i in range(num):
+        genes = pick(300)
+        work['gene_connections'].append(('post', '/gene_connections', {
+            'network': net.name,
+            'edgeCutoff': dflt['edgeCutoff'],
+            'allGenes': ','.join(genes),
+            'newGenes': genes[-1]
+        }))
+        # Walk the slider over a handful of loaded gene sets
+        work['edge_cutoff'].append(('post', '/edge_cutoff', {
+            'network': net.name,
+            'edgeCutoff': 1.0 + i % 10,
+            'genes': ','.join(sets[i % len(sets)])
+        }))
+
+    # The edges of a gene set the way the network routes build them
+    def edges(genes, cob, cutoff):
+        return server.edgeObjects(
+            *server.edgeIndex(cob, genes).edges(cutoff, genes))
+
+    # The same edges the way the server used to build them, from camoco's
+    # subnetwork at the network's current cutoff, as a baseline
+    def camoco_edges(genes, cob, cutoff):
+        subnet = cob.subnetwork(
+            cob.refgen.from_ids(genes),
+            names_as_index=False,
+            names_as_cols=True)
+        return [{
+            'group': 'edges',
+            'data': {
+                'source': source,
+                'target': target,
+                'weight': str(weight)
+            }
+        } for source, target, weight, significant, distance in
+                subnet.itertuples(index=False)]
+
+    # The node and edge builders on their own, outside of any route
+    cob = server.networks[net.name]
+    cob.set_sig_edge_zscore(dflt['edgeCutoff'])
+    work['getNodes'] = [('call',
+                         functools.partial(
+                             server.getNodes, edgeCutoff=dflt['edgeCutoff']),
+                         (cob.refgen.from_ids(pick(300)), cob, 'bench'))
+                        for i in range(num)]
+    work['getNodes (camoco)'] = [('call', server.getNodes,
+                                  (cob.refgen.from_ids(pick(300)), cob,
+                                   'bench')) for i in range(num)]
+    edge_sets = [pick(300) for i in range(num)]
+    work['edgeIndex'] = [('call', edges, (genes, cob, dflt['edgeCutoff']))
+                         for genes in edge_sets]
+    work['edgeIndex (camoco)'] = [('call', camoco_edges,
+                                   (genes, cob, dflt['edgeCutoff']))
+                                  for genes in edge_sets]
+    return work
+
+
+def run_one(server, client, job):
+    kind, target, payload = job
+    if kind == 'call':
+        with server.app.test_request_context():
+            target(*payload)
+        return 200
+    resp = getattr(client, kind)(target, data=payload)
+    resp.get_data()
+    return resp.status_code
+
+
+def bench_route(server, client, jobs, repeat):
+    # Warm up, and measure the peak memory of a single request
+    tracemalloc.start()
+    run_one(server, client, jobs[0])
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    times = []
+    errors = 0
+    start = time.perf_counter()
+    for i in range(repeat):
+        job = jobs[i % len(jobs)]
+        t = time.perf_counter()
+        if run_one(server, client, job) >= 400:
+            errors += 1
+        times.append(time.perf_counter() - t)
+    total = time.perf_counter() - start
+    times = np.array(times) * 1000
+    return {
+        'requests': repeat,
+        'errors': errors,
+        'mean_ms': float(times.mean()),
+        'p50_ms': float(np.percentile(times, 50)),
+        'p95_ms': float(np.percentile(times, 95)),
+        'throughput': repeat / total,
+        'peak_mib': peak / 2**20
+    }
+
+
+def bench_size(size, repeat, seed, routes=None):
+    genes, terms = SIZES[size]
+    print('Building {} genes / {} terms...'.format(genes, terms),
+          file=sys.stderr)
+    t = time.perf_counter()
+    data = synthetic.build_datasets(genes, terms, seed=seed)
+    build = time.perf_counter() - t
+    synthetic.install(data)
+
+    scratch = tempfile.mkdtemp(prefix='cob-bench-')
+    try:
+        t = time.perf_counter()
+        server = load_server(scratch)
+        server.loaded.wait()
+        startup = time.perf_counter() - t
+        client = server.app.test_client()
+        results = {
+            '(build)': {'seconds': build},
+            '(startup)': {'seconds': startup}
+        }
+        rng = np.random.default_rng(seed)
+        for route, jobs in workloads(server, data, rng).items():
+            if routes and route not in routes:
+                continue
+            print('  {}'.format(route), file=sys.stderr)
+            results[route] = bench_route(server, client, jobs, repeat)
+        return results
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def report(results, baseline=None):
+    head = '{:<6} {:<20} {:>9} {:>9} {:>9} {:>9} {:>9} {:>6}'.format(
+        'size', 'route', 'mean ms', 'p50 ms', 'p95 ms', 'req/s', 'peak MiB',
+        'errors')
+    if baseline:
+        head += ' {:>8}'.format('vs base')
+    print(head)
+    print('-' * len(head))
+    for size, routes in results.items():
+        for route, res in routes.items():
+            if 'seconds' in res:
+                print('{:<6} {:<20} {:>9.1f}'.format(size, route,
+                                                     res['seconds'] * 1000))
+                continue
+            line = ('{:<6} {:<20} {mean_ms:>9.2f} {p50_ms:>9.2f} '
+                    '{p95_ms:>9.2f} {throughput:>9.1f} {peak_mib:>9.2f} '
+                    '{errors:>6}').format(size, route, **res)
+            base = (baseline or {}).get(size, {}).get(route)
+            if base and 'mean_ms' in base:
+                line += ' {:>7.2f}x'.format(res['mean_ms'] / base['mean_ms'])
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the COB server routes on synthetic data.')
+    parser.add_argument(
+        '--sizes',
+        nargs='+',
+        default=['1k', '5k'],
+        choices=list(SIZES),
+        help='Dataset sizes to run.')
+    parser.add_argument(
+        '--routes',
+        nargs='+',
+        default=None,
+        help='Only run these routes (default is all of them).')
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=20,
+        help='Number of timed requests per route.')
+    parser.add_argument(
+        '--seed', type=int, default=0, help='Seed for the synthetic data.')
+    parser.add_argument(
+        '--json', default=None, help='Save the results to this file.')
+    parser.add_argument(
+        '--compare',
+        default=None,
+        help='Compare against results saved with --json.')
+    args = parser.parse_args()
+
+    results = {}
+    for size in args.sizes:
+        results[size] = bench_size(size, args.repeat, args.seed, args.routes)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as fd:
+            baseline = json.load(fd)
+    report(results, baseline)
+
+    if args.json:
+        with open(args.json, 'w') as fd:
+            json.dump(results, fd, indent=2)
+
+
+if __name__ == '__main__':
+    main()
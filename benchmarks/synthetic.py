@@ -0,0 +1,626 @@
+#!/usr/bin/python3
+'''
+Synthetic stand-ins for the Camoco datasets COB serves.
+
+Camoco keeps its networks, RefGens, GWAS and Overlap runs in a database under
+its basedir, which is slow to build and far too big to ship. This module fakes
+just enough of the `camoco` API used by `cob.server` to drive the server at
+controlled sizes: `install(build_datasets(...))` registers a module named
+`camoco` in `sys.modules` that serves the generated data.
+
+The co-expression scores are stored the way Camoco stores them, as a condensed
+upper triangle (`coex`, one row per gene pair) ordered by the rows of `_expr`,
+so the memory and time costs scale the same way they do on a real network.
+Like Camoco's, `coex` is a table of columns read through `coex.data[column]`
+rather than a pandas frame, so the server has to read it the same way.
+'''
+
+import sys
+import types
+import logging
+import itertools
+import numpy as np
+import pandas as pd
+from bisect import bisect_left, bisect_right
+
+log = logging.getLogger('cob.synthetic')
+
+
+# --------------------------------------------
+#     Loci and Reference Genomes
+# --------------------------------------------
+class Locus(object):
+    def __init__(self, chrom, start, end=None, id=None, window=0,
+                 sub_loci=None, **kwargs):
+        self.chrom = str(chrom)
+        self.start = int(start)
+        self.end = int(start if end is None else end)
+        self.id = id
+        self.window = int(window)
+        self.sub_loci = sub_loci or []
+        self.attr = dict(kwargs)
+
+    @property
+    def upstream(self):
+        return self.start - self.window
+
+    @property
+    def downstream(self):
+        return self.end + self.window
+
+    @property
+    def center(self):
+        return (self.start + self.end) / 2
+
+    def update(self, attrs):
+        self.attr.update(attrs)
+
+    def copy(self, **kwargs):
+        return Locus(self.chrom, self.start, self.end, id=self.id,
+                     window=self.window, **dict(self.attr, **kwargs))
+
+    def __repr__(self):
+        return '<{}>{}:{}-{}'.format(self.id, self.chrom, self.start,
+                                     self.end)
+
+
+class RefGen(object):
+    def __init__(self, name, genes, annotations=None, aliases=None):
+        self.name = name
+        self.description = 'Synthetic RefGen with {} genes'.format(len(genes))
+        self._genes = genes
+        self._by_id = {g.id: g for g in genes}
+        self._annotations = annotations or {}
+        self._aliases = aliases or {}
+
+        # Per chromosome gene starts, for the window searches
+        self._chroms = {}
+        for gene in genes:
+            self._chroms.setdefault(gene.chrom, []).append(gene)
+        for chrom, genes in self._chroms.items():
+            genes.sort(key=lambda x: x.start)
+        self._starts = {
+            chrom: [g.start for g in genes]
+            for chrom, genes in self._chroms.items()
+        }
+
+    def __len__(self):
+        return len(self._genes)
+
+    def __getitem__(self, ids):
+        if isinstance(ids, str):
+            return self.from_id(ids)
+        return self.from_ids(ids)
+
+    def iter_genes(self):
+        for gene in self._genes:
+            yield gene.copy()
+
+    def from_id(self, id):
+        if id not in self._by_id:
+            raise ValueError('{} not in {}'.format(id, self.name))
+        return self._by_id[id].copy()
+
+    def from_ids(self, ids):
+        return [self._by_id[x].copy() for x in ids if x in self._by_id]
+
+    def aliases(self, ids):
+        return {x: self._aliases[x] for x in ids if x in self._aliases}
+
+    def has_annotations(self):
+        return len(self._annotations) > 0
+
+    def get_annotations(self, ids):
+        return {
+            x: self._annotations[x]
+            for x in ids if x in self._annotations
+        }
+
+    def export_annotations(self, filename):
+        with open(filename, 'w') as out:
+            out.write('gene\tdesc\n')
+            for id, anotes in self._annotations.items():
+                out.write('{}\t{}\n'.format(id, ' '.join(anotes)))
+
+    # Genes overlapping the locus itself
+    def genes_within(self, locus):
+        genes = self._chroms.get(locus.chrom, [])
+        starts = self._starts.get(locus.chrom, [])
+        hi = bisect_right(starts, locus.end)
+        # Gene lengths are bounded, so only look back a limited distance
+        lo = bisect_left(starts, locus.start - MAX_GENE_LENGTH)
+        return [
+            g.copy() for g in genes[lo:hi]
+            if g.end >= locus.start and g.start <= locus.end
+        ]
+
+    # Nearest genes starting before the locus, within the window
+    def upstream_genes(self, locus, gene_limit=1000, window_size=None):
+        window = locus.window if window_size is None else window_size
+        genes = self._chroms.get(locus.chrom, [])
+        starts = self._starts.get(locus.chrom, [])
+        lo = bisect_left(starts, locus.start - window)
+        hi = bisect_left(starts, locus.start)
+        hits = [g for g in reversed(genes[lo:hi]) if g.end < locus.start]
+        return [g.copy() for g in hits[:gene_limit]]
+
+    # Nearest genes starting after the locus, within the window
+    def downstream_genes(self, locus, gene_limit=1000, window_size=None):
+        window = locus.window if window_size is None else window_size
+        genes = self._chroms.get(locus.chrom, [])
+        starts = self._starts.get(locus.chrom, [])
+        lo = bisect_right(starts, locus.end)
+        hi = bisect_right(starts, locus.end + window)
+        return [g.copy() for g in genes[lo:hi][:gene_limit]]
+
+    def candidate_genes(self,
+                        loci,
+                        flank_limit=2,
+                        chain=True,
+                        window_size=None,
+                        include_parent_locus=False,
+                        include_parent_attrs=False,
+                        include_num_intervening=False,
+                        include_rank_intervening=False,
+                        include_num_siblings=False,
+                        **kwargs):
+        if isinstance(loci, Locus):
+            loci = [loci]
+        genes_list = []
+        for locus in loci:
+            if window_size is not None:
+                locus.window = window_size
+            genes_within = self.genes_within(locus)
+            up_genes = self.upstream_genes(
+                locus, gene_limit=flank_limit, window_size=window_size)
+            down_genes = self.downstream_genes(
+                locus, gene_limit=flank_limit, window_size=window_size)
+            genes = sorted(
+                itertools.chain(up_genes, genes_within, down_genes),
+                key=lambda x: x.start)
+            within = set(g.id for g in genes_within)
+
+            if include_parent_locus:
+                for gene in genes:
+                    gene.update({'parent_locus': repr(locus)})
+            if include_num_intervening:
+                num_down = num_up = 0
+                for gene in sorted(
+                        genes, key=lambda x: abs(locus.center - x.center)):
+                    if gene.id in within:
+                        gene.update({'num_intervening': -1})
+                    elif gene.center >= locus.center:
+                        gene.update({'num_intervening': num_down})
+                        num_down += 1
+                    else:
+                        gene.update({'num_intervening': num_up})
+                        num_up += 1
+            if include_rank_intervening:
+                ranks = pd.Series(
+                    [abs(locus.center - x.center) for x in genes]).rank()
+                for gene, rank in zip(genes, ranks):
+                    gene.update({'intervening_rank': rank})
+            if include_num_siblings:
+                for gene in genes:
+                    gene.update({'num_siblings': len(genes)})
+            genes_list.append(genes)
+
+        if not chain:
+            return genes_list
+        seen = set()
+        chained = []
+        for gene in itertools.chain(*genes_list):
+            if gene.id not in seen:
+                seen.add(gene.id)
+                chained.append(gene)
+        return chained
+
+
+# Longest synthetic gene, bounds the look back of genes_within
+MAX_GENE_LENGTH = 8000
+
+
+# --------------------------------------------
+#     Co-expression Networks
+# --------------------------------------------
+# Position of the (i, j) pair in the condensed upper triangle, i < j
+def condensed_index(i, j, n):
+    i = np.asarray(i, dtype=np.int64)
+    j = np.asarray(j, dtype=np.int64)
+    return n * i - i * (i + 1) // 2 + j - i - 1
+
+
+# --------------------------------------------
+#     Column Storage Like Camoco's bcolz Tables
+# --------------------------------------------
+# Camoco keeps the coex table as a bcolz ctable wrapped in a blaze Data. Only
+# what the real objects offer is here: `Data.data` is the ctable, indexing it
+# by name gives a column, and a column reads slices or integer indices into a
+# new ndarray, without any pandas access such as `.values`.
+class Carray(object):
+    def __init__(self, values):
+        self._values = values
+        self.dtype = values.dtype
+        self.chunklen = 2**16
+
+    def __len__(self):
+        return len(self._values)
+
+    def __getitem__(self, key):
+        return np.array(self._values[key])
+
+    def __setitem__(self, key, val):
+        self._values[key] = val
+
+
+class Ctable(object):
+    def __init__(self, columns):
+        self.cols = {k: Carray(np.asarray(v)) for k, v in columns.items()}
+        self.names = list(self.cols)
+
+    def __len__(self):
+        return len(next(iter(self.cols.values())))
+
+    def __getitem__(self, name):
+        return self.cols[name]
+
+    def addcol(self, values, name):
+        self.cols[name] = Carray(np.asarray(values))
+        self.names.append(name)
+
+
+class BlazeData(object):
+    def __init__(self, ctable):
+        self.data = ctable
+
+
+class COB(object):
+    def __init__(self, name, refgen, scores, sig=3.0):
+        self.name = name
+        self.description = 'Synthetic network with {} genes'.format(
+            len(refgen))
+        self.refgen = refgen
+        self._globals = {
+            'parent_refgen': refgen.name,
+            'significance_threshold': sig
+        }
+        ids = [g.id for g in refgen._genes]
+        self._expr = pd.DataFrame(
+            np.zeros((len(ids), 2), dtype=np.float32),
+            index=pd.Index(ids, name='gene'),
+            columns=['Acc1', 'Acc2'])
+        self._expr_index = {id: i for i, id in enumerate(ids)}
+        self.coex = BlazeData(Ctable({'score': scores}))
+        self.set_sig_edge_zscore(sig)
+
+    def _global(self, key, val=None):
+        if val is not None:
+            self._globals[key] = val
+        return self._globals.get(key)
+
+    def log(self, msg, *args):
+        log.debug(msg.format(*args))
+
+    def set_sig_edge_zscore(self, zscore):
+        self._global('significance_threshold', zscore)
+        significant = self.coex.data['score'][:] >= zscore
+        if 'significant' in self.coex.data.names:
+            self.coex.data['significant'][:] = significant
+        else:
+            self.coex.data.addcol(significant, 'significant')
+        self._calculate_degree()
+
+    def _calculate_degree(self):
+        n = len(self._expr_index)
+        sig = self.coex.data['significant'][:]
+        degree = np.zeros(n, dtype=np.int64)
+        for i in range(n - 1):
+            lo = condensed_index(i, i + 1, n)
+            row = sig[lo:lo + n - i - 1]
+            degree[i] += row.sum()
+            degree[i + 1:] += row
+        self.degree = pd.DataFrame(
+            {'Degree': degree}, index=self._expr.index)
+
+    def _ids(self, gene_list):
+        ids = [
+            self._expr_index[x.id] for x in gene_list
+            if x.id in self._expr_index
+        ]
+        return np.array(sorted(set(ids)), dtype=np.int64)
+
+    def _frame(self, a, b, idx, names_as_index, names_as_cols):
+        names = self._expr.index.values
+        genes = self.refgen._by_id
+        starts = np.array([genes[names[x]].start for x in a])
+        other = np.array([genes[names[x]].start for x in b])
+        chroms = np.array([genes[names[x]].chrom for x in a])
+        ochroms = np.array([genes[names[x]].chrom for x in b])
+        distance = np.where(chroms == ochroms,
+                            np.abs(starts - other).astype(np.float32),
+                            np.inf)
+        frame = pd.DataFrame({
+            'gene_a': names[a],
+            'gene_b': names[b],
+            'score': self.coex.data['score'][idx],
+            'significant': self.coex.data['significant'][idx],
+            'distance': distance
+        })
+        if names_as_index:
+            frame = frame.set_index(['gene_a', 'gene_b'])
+        return frame
+
+    def subnetwork(self,
+                   gene_list=None,
+                   sig_only=True,
+                   min_distance=None,
+                   filter_missing_gene_ids=True,
+                   trans_locus_only=False,
+                   names_as_index=True,
+                   names_as_cols=False):
+        ids = self._ids(gene_list)
+        a, b = np.triu_indices(len(ids), k=1)
+        a, b = ids[a], ids[b]
+        idx = condensed_index(a, b, len(self._expr_index))
+        if sig_only:
+            keep = self.coex.data['significant'][idx]
+            a, b, idx = a[keep], b[keep], idx[keep]
+        return self._frame(a, b, idx, names_as_index, names_as_cols)
+
+    def neighbors(self,
+                  gene,
+                  sig_only=True,
+                  names_as_index=True,
+                  names_as_cols=False,
+                  return_gene_set=False):
+        n = len(self._expr_index)
+        g = self._expr_index[gene.id]
+        before = np.arange(g, dtype=np.int64)
+        after = np.arange(g + 1, n, dtype=np.int64)
+        a = np.concatenate([before, np.full(len(after), g)])
+        b = np.concatenate([np.full(len(before), g), after])
+        idx = condensed_index(a, b, n)
+        if sig_only:
+            keep = self.coex.data['significant'][idx]
+            a, b, idx = a[keep], b[keep], idx[keep]
+        if return_gene_set:
+            names = self._expr.index.values
+            return set(names[a]).union(names[b]) - {gene.id}
+        return self._frame(a, b, idx, names_as_index, names_as_cols)
+
+    def locality(self, gene_list, iter_name=None, include_regression=False):
+        gene_list = list(gene_list)
+        sub = self.subnetwork(gene_list, names_as_index=False)
+        local = pd.concat([sub.gene_a, sub.gene_b]).value_counts()
+        ids = [x.id for x in gene_list if x.id in self._expr_index]
+        ids = list(dict.fromkeys(ids))
+        frame = pd.DataFrame({
+            'local': local.reindex(ids).fillna(0).astype(int).values,
+            'global': self.degree.Degree.reindex(ids).values
+        }, index=pd.Index(ids, name='gene'))
+        return frame
+
+
+# --------------------------------------------
+#     GWAS and Overlap Results
+# --------------------------------------------
+class Term(object):
+    def __init__(self, id, desc, loci):
+        self.id = id
+        self.name = id
+        self.desc = desc
+        self.loci = loci
+
+    # Merge SNPs with overlapping windows
+    def _merged(self, window_size):
+        loci = sorted(self.loci, key=lambda x: (x.chrom, x.start))
+        groups = []
+        for locus in loci:
+            if (groups and groups[-1][-1].chrom == locus.chrom and
+                    locus.start - window_size <=
+                    groups[-1][-1].end + window_size):
+                groups[-1].append(locus)
+            else:
+                groups.append([locus])
+        return groups
+
+    def effective_loci(self, window_size=None):
+        window_size = window_size or 0
+        return [
+            Locus(
+                group[0].chrom,
+                min(x.start for x in group),
+                max(x.end for x in group),
+                id=group[0].id,
+                window=window_size,
+                sub_loci=group) for group in self._merged(window_size)
+        ]
+
+    def strongest_loci(self, window_size=None, attr='pval', lowest=True):
+        window_size = window_size or 0
+        loci = []
+        for group in self._merged(window_size):
+            best = (min if lowest else max)(group, key=lambda x: x.attr[attr])
+            best = best.copy()
+            best.window = window_size
+            loci.append(best)
+        return loci
+
+
+class GWAS(object):
+    def __init__(self, name, refgen, terms):
+        self.name = name
+        self.description = 'Synthetic GWAS with {} terms'.format(len(terms))
+        self.refgen = refgen
+        self._terms = {t.id: t for t in terms}
+
+    def __getitem__(self, id):
+        return self._terms[id]
+
+    def __len__(self):
+        return len(self._terms)
+
+    def iter_terms(self):
+        return iter(self._terms.values())
+
+    def get_strongest_attr(self):
+        return 'pval'
+
+    def get_strongest_higher(self):
+        return True
+
+
+class Overlap(object):
+    def __init__(self, name, results):
+        self.name = name
+        self.description = 'Synthetic Overlap results'
+        self.results = results
+
+    def high_priority_candidates(self, fdr_cutoff=0.3, min_snp2gene_obs=2):
+        hpo = self.results[self.results.fdr <= fdr_cutoff]
+        counts = hpo.groupby(['COB', 'Ontology', 'Term', 'gene'],
+                             observed=True).size()
+        counts = counts[counts >= min_snp2gene_obs].reset_index()
+        return counts[['COB', 'Ontology', 'Term', 'gene']]
+
+
+# --------------------------------------------
+#     Dataset Generation
+# --------------------------------------------
+class Datasets(object):
+    def __init__(self):
+        self.refgens = {}
+        self.networks = {}
+        self.gwas = {}
+        self.overlaps = {}
+
+    def available(self, type=None):
+        rows = []
+        for kind, db in (('RefGen', self.refgens), ('Expr', self.networks),
+                         ('GWAS', self.gwas), ('Overlap', self.overlaps)):
+            if type is None or type == kind:
+                for name, obj in db.items():
+                    rows.append((name, obj.description, kind))
+        return pd.DataFrame(rows, columns=['Name', 'Description', 'Type'])
+
+
+def _refgen(name, num_genes, rng, num_chroms=10):
+    per_chrom = int(np.ceil(num_genes / num_chroms))
+    annotations = {}
+    aliases = {}
+    # Space genes along each chromosome with random gaps
+    gaps = rng.integers(2000, 60000, size=num_genes)
+    lengths = rng.integers(500, MAX_GENE_LENGTH, size=num_genes)
+    loci = []
+    pos = 0
+    for i in range(num_genes):
+        chrom = str(i // per_chrom + 1)
+        if i % per_chrom == 0:
+            pos = 0
+        pos += int(gaps[i])
+        id = 'G{}{:06d}'.format(name[-1], i)
+        loci.append(Locus(chrom, pos, pos + int(lengths[i]), id=id))
+        pos += int(lengths[i])
+        if i % 3 == 0:
+            aliases[id] = ['alias{}'.format(i)]
+        if i % 2 == 0:
+            annotations[id] = ['synthetic', 'function{}'.format(i % 97)]
+    return RefGen(name, loci, annotations=annotations, aliases=aliases)
+
+
+def _scores(num_genes, rng, module_size=50, module_shift=3.0):
+    # Genes in the same module are more strongly co-expressed
+    modules = rng.integers(0, max(1, num_genes // module_size),
+                           size=num_genes)
+    scores = np.empty(num_genes * (num_genes - 1) // 2, dtype=np.float32)
+    for i in range(num_genes - 1):
+        lo = int(condensed_index(i, i + 1, num_genes))
+        row = rng.standard_normal(num_genes - i - 1, dtype=np.float32)
+        row += module_shift * (modules[i + 1:] == modules[i])
+        scores[lo:lo + num_genes - i - 1] = row
+    return scores
+
+
+def _terms(refgen, num_terms, rng, max_snps=30):
+    chroms = {c: (g[0].start, g[-1].end) for c, g in refgen._chroms.items()}
+    names = sorted(chroms)
+    terms = []
+    for t in range(num_terms):
+        loci = []
+        for s in range(int(rng.integers(1, max_snps + 1))):
+            chrom = names[int(rng.integers(len(names)))]
+            pos = int(rng.integers(*chroms[chrom]))
+            loci.append(
+                Locus(chrom, pos, id='S{}_{}'.format(chrom, pos),
+                      pval=float(rng.random())))
+        terms.append(Term('Trait{:05d}'.format(t), 'Synthetic trait', loci))
+    return terms
+
+
+def _overlap(gwas, networks, rng, genes_per_term=20):
+    frames = []
+    for net in networks:
+        ids = net._expr.index.values
+        for term in gwas.iter_terms():
+            genes = ids[rng.integers(0, len(ids), size=genes_per_term)]
+            for ws, fl, s2g, method in itertools.product(
+                    (50000, 100000), (1, 2), ('strongest', 'effective'),
+                    ('density', 'locality')):
+                frames.append(
+                    pd.DataFrame({
+                        'COB': net.name,
+                        'Ontology': gwas.name,
+                        'Term': term.id,
+                        'WindowSize': ws,
+                        'FlankLimit': fl,
+                        'SNP2Gene': s2g,
+                        'Method': method,
+                        'gene': genes,
+                        'num_real': rng.random(genes_per_term),
+                        'bs_mean': rng.random(genes_per_term),
+                        'pval': rng.random(genes_per_term),
+                        'fdr': rng.random(genes_per_term)
+                    }))
+    return pd.concat(frames, ignore_index=True)
+
+
+# Build one RefGen with a network, a GWAS and its Overlap results
+def build_datasets(num_genes, num_terms, seed=0, num_networks=1):
+    rng = np.random.default_rng(seed)
+    data = Datasets()
+    refgen = _refgen('SynRef', num_genes, rng)
+    data.refgens[refgen.name] = refgen
+    for i in range(num_networks):
+        net = COB('SynNet{}'.format(i), refgen, _scores(num_genes, rng))
+        data.networks[net.name] = net
+    gwas = GWAS('SynGWAS', refgen, _terms(refgen, num_terms, rng))
+    data.gwas[gwas.name] = gwas
+    # Overlap runs are named after the GWAS they were run on
+    data.overlaps[gwas.name] = Overlap(
+        gwas.name, _overlap(gwas, data.networks.values(), rng))
+    return data
+
+
+# Register a `camoco` module serving the datasets
+def install(data):
+    def lookup(db, kind):
+        def get(name):
+            if name not in db:
+                raise ValueError('No {} named {}'.format(kind, name))
+            return db[name]
+
+        return get
+
+    camoco = types.ModuleType('camoco')
+    camoco.Locus = Locus
+    camoco.COB = lookup(data.networks, 'COB')
+    camoco.RefGen = lookup(data.refgens, 'RefGen')
+    camoco.GWAS = lookup(data.gwas, 'GWAS')
+    # Camoco reads the Overlap results from disk on each open, and the server
+    # replaces them with a trimmed copy, so hand out a new Overlap every time
+    overlap = lookup(data.overlaps, 'Overlap')
+    camoco.Overlap = lambda name: Overlap(name, overlap(name).results)
+    camoco.GOnt = lookup({}, 'GOnt')
+    camoco.Tools = types.SimpleNamespace(available_datasets=data.available)
+    sys.modules['camoco'] = camoco
+    return camoco
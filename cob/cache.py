@@ -0,0 +1,56 @@
+#!/usr/bin/python3
+
+import threading
+from collections import OrderedDict
+
+
+# --------------------------------------------
+#     Bounded Least Recently Used Cache
+# --------------------------------------------
+class LRUCache(object):
+    def __init__(self, name, maxsize, metrics=None):
+        self.name = name
+        self.maxsize = maxsize
+        self.metrics = metrics
+        self.lock = threading.Lock()
+        self.data = OrderedDict()
+
+    def __len__(self):
+        return len(self.data)
+
+    def get(self, key, default=None):
+        with self.lock:
+            hit = key in self.data
+            if hit:
+                self.data.move_to_end(key)
+                val = self.data[key]
+            else:
+                val = default
+        if self.metrics is not None:
+            self.metrics.cache_lookup(self.name, hit)
+        return val
+
+    def put(self, key, val):
+        with self.lock:
+            self.data[key] = val
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+        return val
+
+    # Get the value, building and storing it if it isn't there
+    def fetch(self, key, build):
+        val = self.get(key)
+        if val is None:
+            val = self.put(key, build())
+        return val
+
+    # Drop every entry whose key matches
+    def evict(self, match):
+        with self.lock:
+            for key in [k for k in self.data if match(k)]:
+                del self.data[key]
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
@@ -0,0 +1,318 @@
+#!/usr/bin/python3
+
+import os
+import numpy as np
+
+# --------------------------------------------
+#     Direct Access to the Co-expression Scores
+# --------------------------------------------
+# Camoco keeps the scores of every gene pair in its `coex` table as the
+# condensed upper triangle of the gene by gene matrix, ordered by the rows of
+# the expression matrix. The table is a bcolz ctable behind a blaze Data, so
+# these helpers pull blocks of that matrix straight out of the score carray
+# instead of going through the pandas heavy subnetwork.
+
+
+# The score column of the coex table, a carray read by slices or indices
+def score_column(cob):
+    return cob.coex.data['score']
+
+
+# Scores at the positions of the condensed table, in the order given. The
+# carray decompresses a chunk at a time, so the positions are read in order.
+def read_scores(cob, idx):
+    column = score_column(cob)
+    idx = np.asarray(idx, dtype=np.int64)
+    scores = np.empty(len(idx), dtype=column.dtype)
+    if len(idx):
+        order = np.argsort(idx, kind='stable')
+        scores[order] = column[idx[order]]
+    return scores
+
+
+# Position of the (i, j) pairs in the condensed table, requires i < j
+def pair_index(i, j, n):
+    i = np.asarray(i, dtype=np.int64)
+    j = np.asarray(j, dtype=np.int64)
+    return n * i - i * (i + 1) // 2 + j - i - 1
+
+
+# Matrix positions of the gene IDs that are in the network, unique and sorted
+def gene_index(cob, ids):
+    index = cob._expr_index
+    return np.unique(
+        np.fromiter((index[x] for x in ids if x in index), dtype=np.int64))
+
+
+# Scores of the (a, b) pairs, in either orientation, a != b
+def pair_scores(cob, a, b):
+    lo = np.minimum(a, b)
+    hi = np.maximum(a, b)
+    idx = pair_index(lo, hi, len(cob._expr_index))
+    return lo, hi, read_scores(cob, idx)
+
+
+# Matrix positions (i, j) of the given positions in the condensed table
+def pair_positions(idx, n):
+    idx = np.asarray(idx, dtype=np.int64)
+    i = (n - 2 - np.floor(
+        np.sqrt(-8 * idx + 4 * n * (n - 1) - 7) / 2 - 0.5)).astype(np.int64)
+    j = idx + i + 1 - n * (n - 1) // 2 + (n - i) * ((n - i) - 1) // 2
+    return i, j
+
+
+# Walk the whole table in chunks, yielding the (i, j, score) of every pair
+# scoring at least the cutoff. The chunks are whole carray chunks, so each one
+# is only decompressed once.
+def iter_edges(cob, cutoff, chunk=2**24):
+    scores = score_column(cob)
+    n = len(cob._expr_index)
+    chunklen = getattr(scores, 'chunklen', 1)
+    chunk = max(chunk // chunklen, 1) * chunklen
+    for start in range(0, len(scores), chunk):
+        block = np.asarray(scores[start:start + chunk])
+        idx = np.flatnonzero(block >= cutoff)
+        i, j = pair_positions(idx + start, n)
+        yield i, j, block[idx]
+
+
+# Significant edges between the new genes and all the others (a new x all
+# block of the matrix), returned as (source IDs, target IDs, scores)
+def block_edges(cob, new_ids, all_ids, cutoff):
+    new = gene_index(cob, new_ids)
+    rest = np.setdiff1d(gene_index(cob, all_ids), new, assume_unique=True)
+
+    # Pairs of new with old genes, then the pairs among the new genes
+    i, j = np.triu_indices(len(new), k=1)
+    a = np.concatenate([np.repeat(new, len(rest)), new[i]])
+    b = np.concatenate([np.tile(rest, len(new)), new[j]])
+
+    lo, hi, scores = pair_scores(cob, a, b)
+    keep = scores >= cutoff
+    names = cob._expr.index.values
+    return names[lo[keep]], names[hi[keep]], scores[keep]
+
+
+# Significant edges among a set of genes, pulled with one fancy index into the
+# scores, returned as (source IDs, target IDs, scores)
+def subset_edges(cob, ids, cutoff):
+    genes = gene_index(cob, ids)
+    i, j = np.triu_indices(len(genes), k=1)
+    lo, hi, scores = pair_scores(cob, genes[i], genes[j])
+    keep = scores >= cutoff
+    names = cob._expr.index.values
+    return names[lo[keep]], names[hi[keep]], scores[keep]
+
+
+# The density of the co-expression among some genes, the mean of all their
+# pair scores scaled by the square root of the number of pairs
+def density(cob, ids):
+    scores = subset_edges(cob, ids, -np.inf)[2]
+    if len(scores) == 0:
+        return None
+    return float(np.mean(scores) * np.sqrt(len(scores)))
+
+
+# --------------------------------------------
+#     Score Sorted Edge Index for a Gene Set
+# --------------------------------------------
+# Every pair among a set of genes scoring at least the lowest allowed cutoff,
+# sorted by descending score, so the edges at any cutoff are a prefix found
+# with a binary search.
+class SortedEdges(object):
+    def __init__(self, cob, ids, min_cutoff):
+        genes = gene_index(cob, ids)
+        i, j = np.triu_indices(len(genes), k=1)
+        lo, hi, scores = pair_scores(cob, genes[i], genes[j])
+        keep = scores >= min_cutoff
+        order = np.argsort(-scores[keep], kind='stable')
+
+        # Genes are sorted by matrix position, so i < j keeps the orientation
+        self.names = cob._expr.index.values[genes]
+        self.a = i[keep][order].astype(np.int32)
+        self.b = j[keep][order].astype(np.int32)
+        self.scores = scores[keep][order]
+        self.min_cutoff = min_cutoff
+
+    # Number of edges scoring at least the cutoff
+    def count(self, cutoff):
+        if cutoff < self.min_cutoff:
+            raise ValueError('Cutoff {} is below the indexed minimum {}'.format(
+                cutoff, self.min_cutoff))
+        return int(np.searchsorted(-self.scores, -cutoff, side='right'))
+
+    # Edges at the cutoff, optionally only those among some of the genes
+    def edges(self, cutoff, ids=None):
+        n = self.count(cutoff)
+        a, b, scores = self.a[:n], self.b[:n], self.scores[:n]
+        if ids is not None:
+            member = np.isin(self.names, list(ids))
+            keep = member[a] & member[b]
+            a, b, scores = a[keep], b[keep], scores[keep]
+        return self.names[a], self.names[b], scores
+
+    # Degree of each gene within the set at the cutoff
+    def degree(self, cutoff):
+        n = self.count(cutoff)
+        size = len(self.names)
+        degree = (np.bincount(self.a[:n], minlength=size) +
+                  np.bincount(self.b[:n], minlength=size))
+        return dict(zip(self.names.tolist(), degree.tolist()))
+
+
+# --------------------------------------------
+#     Global Degree at Common Cutoffs
+# --------------------------------------------
+# The degree of every gene in the network at each of a set of cutoffs, found in
+# one pass over the scores and kept as a (cutoffs x genes) array.
+class DegreeTable(object):
+    def __init__(self, cob, cutoffs):
+        self.cutoffs = np.unique(np.asarray(cutoffs, dtype=np.float64))
+        self.index = cob._expr_index
+        n = len(self.index)
+        levels = len(self.cutoffs) + 1
+        counts = np.zeros(levels * n, dtype=np.int64)
+        for i, j, scores in iter_edges(cob, self.cutoffs[0]):
+            # How many of the cutoffs each edge passes
+            level = np.searchsorted(self.cutoffs, scores, side='right')
+            counts += np.bincount(level * n + i, minlength=levels * n)
+            counts += np.bincount(level * n + j, minlength=levels * n)
+        # Genes with an edge at a higher level also count at all lower ones
+        counts = counts.reshape(levels, n)[:0:-1].cumsum(axis=0)[::-1]
+        self.degrees = counts.astype(np.uint32)
+
+    def has(self, cutoff):
+        return bool(np.isclose(self.cutoffs, cutoff).any())
+
+    # Global degree of the genes at the cutoff, None if it isn't in the table
+    def degree(self, cutoff, ids):
+        match = np.flatnonzero(np.isclose(self.cutoffs, cutoff))
+        if len(match) == 0:
+            return None
+        row = self.degrees[match[0]]
+        return {x: int(row[self.index[x]]) for x in ids if x in self.index}
+
+
+# --------------------------------------------
+#     Sparse Adjacency of the Significant Edges
+# --------------------------------------------
+# Compressed sparse rows of every edge scoring at least a minimum cutoff, both
+# orientations, int32 column indices and float32 scores. The arrays can be
+# written to a folder and memory mapped, so the pages are shared between
+# server processes and only the touched rows need to be resident.
+class Adjacency(object):
+    def __init__(self, names, indptr, indices, scores, min_cutoff,
+                 folder=None):
+        self.names = names
+        self.index = {x: i for i, x in enumerate(names.tolist())}
+        self.indptr = indptr
+        self.indices = indices
+        self.scores = scores
+        self.min_cutoff = min_cutoff
+        self.folder = folder
+
+    @classmethod
+    def from_cob(cls, cob, min_cutoff, folder=None):
+        n = len(cob._expr_index)
+        rows, cols, scores = [], [], []
+        for i, j, s in iter_edges(cob, min_cutoff):
+            rows += [i.astype(np.int32), j.astype(np.int32)]
+            cols += [j.astype(np.int32), i.astype(np.int32)]
+            scores += [s.astype(np.float32)] * 2
+        rows = np.concatenate(rows) if rows else np.zeros(0, np.int32)
+        cols = np.concatenate(cols) if cols else np.zeros(0, np.int32)
+        scores = np.concatenate(scores) if scores else np.zeros(0, np.float32)
+
+        # Sort by row then column and count the row lengths
+        order = np.lexsort((cols, rows))
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+        arrays = {
+            'indptr': indptr,
+            'indices': cols[order],
+            'scores': scores[order]
+        }
+        del rows, cols, scores, order
+
+        if folder is not None:
+            os.makedirs(folder, exist_ok=True)
+            for name, arr in arrays.items():
+                # Other workers may be loading the same network, so write a
+                # private copy and swap it in whole
+                path = os.path.join(folder, name + '.npy')
+                tmp = '{}.{}.tmp'.format(path, os.getpid())
+                with open(tmp, 'wb') as fd:
+                    np.save(fd, arr)
+                os.replace(tmp, path)
+            return cls.load(cob._expr.index.values, folder, min_cutoff)
+        return cls(cob._expr.index.values, min_cutoff=min_cutoff, **arrays)
+
+    # Memory map the arrays a from_cob call wrote to the folder
+    @classmethod
+    def load(cls, names, folder, min_cutoff):
+        arrays = {
+            name: np.load(os.path.join(folder, name + '.npy'), mmap_mode='r')
+            for name in ('indptr', 'indices', 'scores')
+        }
+        return cls(names, min_cutoff=min_cutoff, folder=folder, **arrays)
+
+    # Whether the adjacency holds all of the edges at the cutoff
+    def covers(self, cutoff):
+        return cutoff >= self.min_cutoff
+
+    @property
+    def nbytes(self):
+        return self.indptr.nbytes + self.indices.nbytes + self.scores.nbytes
+
+    def positions(self, ids):
+        return np.unique(
+            np.fromiter((self.index[x] for x in ids if x in self.index),
+                        dtype=np.int64))
+
+    # Entries of the given rows, as (row, column, score) arrays
+    def _rows(self, rows):
+        starts = self.indptr[rows]
+        lengths = self.indptr[rows + 1] - starts
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        idx = offsets + np.arange(lengths.sum())
+        return (np.repeat(rows, lengths), self.indices[idx],
+                self.scores[idx])
+
+    # Edges among the genes, returned as (source IDs, target IDs, scores)
+    def edges(self, ids, cutoff):
+        genes = self.positions(ids)
+        member = np.zeros(len(self.names), dtype=bool)
+        member[genes] = True
+        a, b, scores = self._rows(genes)
+        keep = member[b] & (a < b) & (scores >= cutoff)
+        return self.names[a[keep]], self.names[b[keep]], scores[keep]
+
+    # Edges between the new genes and all the genes (both sets can overlap)
+    def block(self, new_ids, all_ids, cutoff):
+        new = self.positions(new_ids)
+        member = np.zeros(len(self.names), dtype=bool)
+        member[self.positions(all_ids)] = True
+        is_new = np.zeros(len(self.names), dtype=bool)
+        is_new[new] = True
+        a, b, scores = self._rows(new)
+        # Pairs of two new genes show up in both rows, only keep one of them
+        keep = ((member[b] | is_new[b]) & (scores >= cutoff) &
+                ~(is_new[b] & (b < a)))
+        a, b, scores = a[keep], b[keep], scores[keep]
+        lo, hi = np.minimum(a, b), np.maximum(a, b)
+        return self.names[lo], self.names[hi], scores
+
+    # Neighbor IDs and scores of a gene
+    def neighbors(self, id, cutoff):
+        i = self.index[id]
+        cols = self.indices[self.indptr[i]:self.indptr[i + 1]]
+        scores = self.scores[self.indptr[i]:self.indptr[i + 1]]
+        keep = scores >= cutoff
+        return self.names[cols[keep]], scores[keep]
+
+    # Global degree of the genes at the cutoff, only reading their own rows
+    def degree(self, cutoff, ids):
+        rows, cols, scores = self._rows(self.positions(ids))
+        counts = np.bincount(
+            rows[scores >= cutoff], minlength=len(self.names))
+        return {x: int(counts[self.index[x]]) for x in ids if x in self.index}
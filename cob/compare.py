@@ -0,0 +1,54 @@
+#!/usr/bin/python3
+
+import camoco as co
+from itertools import chain
+from collections import Counter
+from cob.coex import subset_edges, density, Adjacency
+
+# Networks opened by this process, by name, as (network, adjacency) pairs
+networks = {}
+
+
+# --------------------------------------------
+#     Comparing a Term Across the Networks
+# --------------------------------------------
+# The pair scoring of the term comparisons, run on a pool of processes that are
+# started fresh rather than forked from the threaded server. So each worker
+# opens the networks it's asked about itself, through camoco and the memory
+# mapped adjacency the server wrote, and keeps them until the pool is replaced.
+def open_network(name, folder, min_cutoff):
+    if name not in networks:
+        cob = co.COB(name)
+        adj = None
+        if folder is not None:
+            adj = Adjacency.load(cob._expr.index.values, folder, min_cutoff)
+        networks[name] = (cob, adj)
+    return networks[name]
+
+
+# Edges, connectivity, density and best connected genes of the candidates in
+# one network. The job is (network, candidate IDs, edge cutoff, adjacency
+# folder, adjacency cutoff, number of hubs), the network and adjacency are
+# opened from it unless they are passed in.
+def compare_network(job, cob=None, adj=None):
+    name, ids, cutoff, folder, min_cutoff, num_hubs = job
+    if cob is None:
+        cob, adj = open_network(name, folder, min_cutoff)
+    ids = [x for x in ids if x in cob._expr_index]
+
+    # Edges among the candidates
+    if adj is not None and adj.covers(cutoff):
+        sources, targets, scores = adj.edges(ids, cutoff)
+    else:
+        sources, targets, scores = subset_edges(cob, ids, cutoff)
+    ldegree = Counter(chain(sources.tolist(), targets.tolist()))
+
+    pairs = len(ids) * (len(ids) - 1) / 2
+    return {
+        'network': name,
+        'nodes': len(ids),
+        'edges': len(scores),
+        'connectivity': len(scores) / pairs if pairs else None,
+        'density': density(cob, ids),
+        'hubs': ldegree.most_common(num_hubs)
+    }
@@ -0,0 +1,144 @@
+#!/usr/bin/python3
+
+import io
+import csv
+import math
+import numbers
+from itertools import chain
+from xml.sax.saxutils import escape, quoteattr
+
+# Rows written between each chunk sent to the client
+CHUNK_ROWS = 1000
+
+# Node fields that only matter to the site, left out of the exports
+HIDDEN_FIELDS = ('type', 'render', 'cur_ldegree')
+
+# GraphML types of the numeric node fields, as getNodes fills them in, all the
+# others are strings. Values that don't fit the type (e.g. the '-' camoco gives
+# for genes without a rank) are left out of that node.
+NODE_TYPES = {
+    'start': 'int',
+    'end': 'int',
+    'ldegree': 'int',
+    'gdegree': 'int',
+    'numIntervening': 'int',
+    'numSiblings': 'int',
+    'rankIntervening': 'double'
+}
+
+
+# The first node and all of the nodes, without reading them ahead
+def _peek(nodes):
+    nodes = iter(nodes)
+    first = next(nodes, None)
+    if first is None:
+        return None, nodes
+    return first, chain([first], nodes)
+
+
+# The exported fields of the nodes, in the order of the first one
+def node_fields(first):
+    if first is None:
+        return ['id']
+    return [x for x in first['data'] if x not in HIDDEN_FIELDS]
+
+
+# A value as written for a field of the type, None if it doesn't fit
+def graphml_value(kind, val):
+    if kind == 'string':
+        return escape(str(val))
+    try:
+        num = float(val)
+    except (TypeError, ValueError):
+        return None
+    if not math.isfinite(num):
+        return None
+    if kind == 'int':
+        return str(int(num)) if num.is_integer() else None
+    # Numbers keep their own shortest form, e.g. float32 scores
+    return str(val) if isinstance(val, numbers.Real) else repr(num)
+
+
+# --------------------------------------------
+#     Streamed Network Formats
+# --------------------------------------------
+# Each of these yields the file in chunks, the nodes as the node dicts built
+# for the site and the edges as parallel (sources, targets, weights) arrays.
+def graphml(nodes, edges):
+    first, nodes = _peek(nodes)
+    fields = node_fields(first)
+    types = [NODE_TYPES.get(x, 'string') for x in fields]
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">'
+    ]
+    for field, kind in zip(fields, types):
+        lines.append(
+            '<key id={0} for="node" attr.name={0} attr.type="{1}"/>'.format(
+                quoteattr(field), kind))
+    lines.append('<key id="weight" for="edge" attr.name="weight" '
+                 'attr.type="double"/>')
+    lines.append('<graph edgedefault="undirected">')
+    yield '\n'.join(lines) + '\n'
+
+    lines = []
+    for node in nodes:
+        data = node['data']
+        attrs = []
+        for field, kind in zip(fields, types):
+            val = graphml_value(kind, data[field]) if field in data else None
+            if val is not None:
+                attrs.append('<data key={}>{}</data>'.format(
+                    quoteattr(field), val))
+        lines.append('<node id={}>{}</node>'.format(
+            quoteattr(str(data['id'])), ''.join(attrs)))
+        if len(lines) >= CHUNK_ROWS:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+
+    for source, target, weight in zip(*edges):
+        weight = graphml_value('double', weight)
+        lines.append('<edge source={} target={}>{}</edge>'.format(
+            quoteattr(str(source)), quoteattr(str(target)),
+            '' if weight is None else
+            '<data key="weight">{}</data>'.format(weight)))
+        if len(lines) >= CHUNK_ROWS:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    lines.append('</graph>\n</graphml>')
+    yield '\n'.join(lines) + '\n'
+
+
+# Delimited rows, written a chunk at a time
+def _delimited(header, rows, delimiter):
+    buf = io.StringIO()
+    writer = csv.writer(buf, delimiter=delimiter, lineterminator='\n')
+    writer.writerow(header)
+    for i, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if i % CHUNK_ROWS == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+
+# Edge list, one tab separated source, target and weight per line
+def edge_tsv(nodes, edges):
+    return _delimited(['source', 'target', 'weight'], zip(*edges), '\t')
+
+
+# Node table, one row of attributes per gene
+def node_csv(nodes, edges):
+    first, nodes = _peek(nodes)
+    fields = node_fields(first)
+    return _delimited(fields, ([node['data'].get(x, '') for x in fields]
+                               for node in nodes), ',')
+
+
+# Exporters by format, with their mimetype and file extension
+formats = {
+    'graphml': (graphml, 'application/xml', 'graphml'),
+    'tsv': (edge_tsv, 'text/tab-separated-values', 'tsv'),
+    'csv': (node_csv, 'text/csv', 'csv')
+}
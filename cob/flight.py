@@ -0,0 +1,95 @@
+#!/usr/bin/python3
+
+import threading
+from contextlib import contextmanager
+
+
+# Raised when too many heavy requests are already running or queued for a key
+class Busy(Exception):
+    def __init__(self, key):
+        super().__init__('Too many requests for {}'.format(key))
+        self.key = key
+
+
+# --------------------------------------------
+#     Sharing One Computation Between Callers
+# --------------------------------------------
+# The first caller with a key runs the computation, the others that come in
+# while it runs wait for it and get the same result (or exception) back.
+class SingleFlight(object):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flights = {}
+
+    def do(self, key, build):
+        with self.lock:
+            flight = self.flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.flights[key] = {
+                    'done': threading.Event(),
+                    'result': None,
+                    'error': None
+                }
+        if not leader:
+            flight['done'].wait()
+            if flight['error'] is not None:
+                raise flight['error']
+            return flight['result']
+
+        try:
+            flight['result'] = build()
+            return flight['result']
+        except Exception as e:
+            flight['error'] = e
+            raise
+        finally:
+            with self.lock:
+                del self.flights[key]
+            flight['done'].set()
+
+    # Number of computations running right now
+    def __len__(self):
+        return len(self.flights)
+
+
+# --------------------------------------------
+#     Bounded Concurrency per Key
+# --------------------------------------------
+# At most limit callers hold a slot for a key at once, up to queue more wait
+# for one (each for at most timeout seconds), anyone else is turned away with
+# Busy. A limit of 0 lets everyone in.
+class Admission(object):
+    def __init__(self, limit, queue=0, timeout=30):
+        self.limit = limit
+        self.queue = queue
+        self.timeout = timeout
+        self.cond = threading.Condition()
+        self.running = {}
+        self.waiting = {}
+
+    @contextmanager
+    def slot(self, key):
+        if not self.limit:
+            yield
+            return
+        with self.cond:
+            if self.running.get(key, 0) >= self.limit:
+                if self.waiting.get(key, 0) >= self.queue:
+                    raise Busy(key)
+                self.waiting[key] = self.waiting.get(key, 0) + 1
+                try:
+                    free = self.cond.wait_for(
+                        lambda: self.running.get(key, 0) < self.limit,
+                        self.timeout)
+                finally:
+                    self.waiting[key] -= 1
+                if not free:
+                    raise Busy(key)
+            self.running[key] = self.running.get(key, 0) + 1
+        try:
+            yield
+        finally:
+            with self.cond:
+                self.running[key] -= 1
+                self.cond.notify_all()
@@ -0,0 +1,195 @@
+#!/usr/bin/python3
+
+import itertools
+import numpy as np
+
+
+# Pair every range [lo, hi) with the positions in it, as (owner, position)
+def _ranges(lo, hi):
+    lengths = np.maximum(hi - lo, 0)
+    owner = np.repeat(np.arange(len(lo)), lengths)
+    offsets = np.repeat(lo - np.cumsum(lengths) + lengths, lengths)
+    return owner, offsets + np.arange(lengths.sum())
+
+
+# Index of each entry within its run of equal keys, keys must be grouped
+def _group_index(keys):
+    if len(keys) == 0:
+        return np.zeros(0, dtype=np.int64)
+    first = np.r_[0, np.flatnonzero(np.diff(keys)) + 1]
+    sizes = np.diff(np.r_[first, len(keys)])
+    return np.arange(len(keys)) - np.repeat(first, sizes)
+
+
+# --------------------------------------------
+#     In Memory Gene Interval Index of a RefGen
+# --------------------------------------------
+# Sorted gene start and end arrays per chromosome, finding the candidate genes
+# of all the loci of a term with a few vectorized searchsorted calls. The
+# rules are the ones RefGen.candidate_genes follows: the genes overlapping the
+# locus, plus up to flank_limit genes starting on each side of it within the
+# window.
+class GeneIntervals(object):
+    def __init__(self, refgen):
+        self.name = refgen.name
+        self.chroms = {}
+        genes = sorted(
+            refgen.iter_genes(), key=lambda x: (str(x.chrom), x.start))
+        self.ids = np.array([x.id for x in genes], dtype=object)
+        self.starts = np.array([x.start for x in genes], dtype=np.int64)
+        self.ends = np.array([x.end for x in genes], dtype=np.int64)
+
+        # Each chromosome is a slice of the sorted arrays
+        offset = 0
+        for chrom, group in itertools.groupby(genes,
+                                              key=lambda x: str(x.chrom)):
+            size = len(list(group))
+            lengths = self.ends[offset:offset + size] - self.starts[
+                offset:offset + size]
+            self.chroms[chrom] = (offset, offset + size, int(lengths.max()))
+            offset += size
+
+    def __len__(self):
+        return len(self.ids)
+
+    # Candidates of loci on one chromosome, as (locus, gene, within) arrays
+    def _chrom_hits(self, chrom, lstarts, lends, windows, flank_limit):
+        offset, stop, maxlen = self.chroms[chrom]
+        starts = self.starts[offset:stop]
+        ends = self.ends[offset:stop]
+
+        # Genes overlapping the locus, genes are at most maxlen long
+        owner, pos = _ranges(
+            np.searchsorted(starts, lstarts - maxlen, side='left'),
+            np.searchsorted(starts, lends, side='right'))
+        keep = ends[pos] >= lstarts[owner]
+        within = (owner[keep], pos[keep])
+
+        # Nearest genes starting before the locus, within the window
+        owner, pos = _ranges(
+            np.searchsorted(starts, lstarts - windows, side='left'),
+            np.searchsorted(starts, lstarts, side='left'))
+        keep = ends[pos] < lstarts[owner]
+        owner, pos = owner[keep], pos[keep]
+        from_end = np.bincount(
+            owner, minlength=len(lstarts))[owner] - 1 - _group_index(owner)
+        keep = from_end < flank_limit
+        up = (owner[keep], pos[keep])
+
+        # Nearest genes starting after the locus, within the window
+        owner, pos = _ranges(
+            np.searchsorted(starts, lends, side='right'),
+            np.searchsorted(starts, lends + windows, side='right'))
+        keep = _group_index(owner) < flank_limit
+        down = (owner[keep], pos[keep])
+
+        return (np.concatenate([up[0], within[0], down[0]]),
+                np.concatenate([up[1], within[1], down[1]]) + offset,
+                np.concatenate([
+                    np.zeros(len(up[0]), dtype=bool),
+                    np.ones(len(within[0]), dtype=bool),
+                    np.zeros(len(down[0]), dtype=bool)
+                ]))
+
+    # All (locus, gene, within) hits of the loci, sorted by locus then start
+    def _hits(self, loci, window_size, flank_limit):
+        chroms = np.array([str(x.chrom) for x in loci], dtype=object)
+        lstarts = np.array([x.start for x in loci], dtype=np.int64)
+        lends = np.array([x.end for x in loci], dtype=np.int64)
+        if window_size is None:
+            windows = np.array([x.window for x in loci], dtype=np.int64)
+        else:
+            windows = np.full(len(loci), window_size, dtype=np.int64)
+
+        hits = [(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64),
+                 np.zeros(0, dtype=bool))]
+        for name in set(chroms.tolist()):
+            if name not in self.chroms:
+                continue
+            idx = np.flatnonzero(chroms == name)
+            owner, gene, within = self._chrom_hits(
+                name, lstarts[idx], lends[idx], windows[idx], flank_limit)
+            hits.append((idx[owner], gene, within))
+        locus, gene, within = (np.concatenate(x) for x in zip(*hits))
+        order = np.lexsort((self.starts[gene], locus))
+        return locus[order], gene[order], within[order], lstarts, lends
+
+    # Candidate genes of the loci, in locus then start order, as a dict of
+    # arrays with the intervening and sibling counts of each gene
+    def search(self, loci, window_size=None, flank_limit=2, chain=True):
+        loci = list(loci)
+        locus, gene, within, lstarts, lends = self._hits(
+            loci, window_size, flank_limit)
+
+        # Distances from the center of the locus
+        lcenters = (lstarts + lends) / 2
+        centers = (self.starts[gene] + self.ends[gene]) / 2
+        distance = np.abs(lcenters[locus] - centers)
+        seq = np.arange(len(gene))
+
+        # Average rank of the distance within each locus
+        order = np.lexsort((distance, locus))
+        rank = np.empty(len(gene))
+        rank[order] = _group_index(locus[order]) + 1
+        if len(gene):
+            runs = np.r_[0, (np.diff(locus[order]) != 0) |
+                         (np.diff(distance[order]) != 0)].cumsum()
+            means = np.bincount(runs, weights=rank[order]) / np.bincount(runs)
+            rank[order] = means[runs]
+
+        # Genes outside the locus count those closer on the same side
+        side = (centers >= lcenters[locus]).astype(np.int64)
+        group = locus * 4 + side * 2 + within
+        order = np.lexsort((seq, distance, group))
+        intervening = np.empty(len(gene), dtype=np.int64)
+        intervening[order] = _group_index(group[order])
+        intervening[within] = -1
+
+        hits = {
+            'locus': locus,
+            'gene': gene,
+            'id': self.ids[gene],
+            'num_intervening': intervening,
+            'intervening_rank': rank,
+            'num_siblings': np.bincount(locus, minlength=len(loci))[locus]
+        }
+        if chain:
+            # Keep the first time each gene was found
+            first = np.sort(np.unique(gene, return_index=True)[1])
+            hits = {k: v[first] for k, v in hits.items()}
+        return hits
+
+    # Number of distinct candidate genes of each of a number of loci lists,
+    # all of them resolved in one pass
+    def count(self, loci_lists, window_size=None, flank_limit=2):
+        loci = []
+        owner = []
+        for i, lst in enumerate(loci_lists):
+            lst = list(lst)
+            loci += lst
+            owner += [i] * len(lst)
+        owner = np.array(owner, dtype=np.int64)
+        locus, gene = self._hits(loci, window_size, flank_limit)[:2]
+        pairs = np.unique(owner[locus] * len(self.ids) + gene)
+        return np.bincount(
+            pairs // len(self.ids), minlength=len(loci_lists)).tolist()
+
+    # Candidate genes of the loci as RefGen loci, with the same attributes
+    # RefGen.candidate_genes adds
+    def candidate_genes(self, refgen, loci, window_size=None, flank_limit=2):
+        loci = list(loci)
+        hits = self.search(loci, window_size, flank_limit)
+        genes = {x.id: x for x in refgen.from_ids(hits['id'].tolist())}
+        found = []
+        for i, id in enumerate(hits['id'].tolist()):
+            gene = genes.get(id)
+            if gene is None:
+                continue
+            gene.update({
+                'parent_locus': repr(loci[hits['locus'][i]]),
+                'num_intervening': int(hits['num_intervening'][i]),
+                'intervening_rank': float(hits['intervening_rank'][i]),
+                'num_siblings': int(hits['num_siblings'][i])
+            })
+            found.append(gene)
+        return found
@@ -0,0 +1,191 @@
+#!/usr/bin/python3
+
+import re
+import numpy as np
+
+
+# Sort key matching the numeric aware localeCompare the site sorts with
+def natural_key(val):
+    return [(0, int(x), '') if x.isdigit() else (1, 0, x.lower())
+            for x in re.split(r'(\d+)', str(val)) if x]
+
+
+# Round half up, like Math.round
+def js_round(val):
+    return np.floor(np.asarray(val, dtype=np.float64) + 0.5)
+
+
+# --------------------------------------------
+#     Polywas Layout
+# --------------------------------------------
+# The positions cob/static/js/polywas-layout.js gives a graph, found ahead of
+# time: chromosomes as chords around a circle, SNPs grouped along them and the
+# genes of each SNP stacked outwards from its group. The nodes are the rendered
+# node dicts and the edges the (sources, targets, weights) arrays among them.
+def polywas(nodes,
+            edges,
+            width=1000,
+            height=1000,
+            node_diameter=30,
+            log_spacing=False,
+            padding=100,
+            chrom_padding=5,
+            rad_width=0.015,
+            snp_levels=3):
+    nodes = [node['data'] for node in nodes]
+    if len(nodes) == 0:
+        return {'chroms': [], 'snpGroups': [], 'genes': {}}
+    ids = [node['id'] for node in nodes]
+
+    # Degree of each gene among the rendered edges
+    index = {x: i for i, x in enumerate(ids)}
+    ends = [index[x] for x in np.concatenate(edges[:2]).tolist() if x in index]
+    degree = np.bincount(
+        np.asarray(ends, dtype=np.int64), minlength=len(ids))
+
+    # Sort the genes by SNP, then by degree, and group them by SNP
+    order = sorted(
+        range(len(ids)),
+        key=lambda i: (natural_key(nodes[i]['snp']), -degree[i]))
+    snps = []
+    for i in order:
+        if not snps or snps[-1]['id'] != nodes[i]['snp']:
+            snps.append({
+                'id': nodes[i]['snp'],
+                'chrom': nodes[i]['chrom'],
+                'start': int(nodes[i]['start']),
+                'end': int(nodes[i]['end']),
+                'genes': []
+            })
+        snp = snps[-1]
+        snp['start'] = min(snp['start'], int(nodes[i]['start']))
+        snp['end'] = max(snp['end'], int(nodes[i]['end']))
+        snp['genes'].append(i)
+    for snp in snps:
+        snp['pos'] = int(js_round((snp['start'] + snp['end']) / 2))
+    snps.sort(key=lambda x: (natural_key(x['chrom']), x['pos']))
+
+    # Virtual positions along the chromosomes, starting at 1 on each
+    chroms = np.array([x['chrom'] for x in snps], dtype=object)
+    pos = np.array([x['pos'] for x in snps], dtype=np.float64)
+    first = np.r_[True, chroms[1:] != chroms[:-1]]
+    dist = np.r_[0, np.diff(pos)]
+    if log_spacing:
+        # Stacked SNPs would be the log of 0, keep them in place instead
+        step = js_round(np.log(np.maximum(dist, 1)))
+    else:
+        step = js_round(dist)
+    step[first] = 1
+    vpos = np.cumsum(step)
+    vpos -= np.repeat(vpos[first] - 1, np.diff(np.r_[np.flatnonzero(first),
+                                                      len(snps)]))
+    chrom_ids = chroms[first].tolist()
+    chrom_lens = vpos[np.r_[np.flatnonzero(first)[1:] - 1, len(snps) - 1]]
+
+    # Chromosomes are chords of the circle, with some padding between them
+    radius = min(width, height) / 2 - padding
+    cx, cy = width / 2, height / 2
+    pad = chrom_padding * np.pi / 180
+    dtheta = 2 * np.pi / len(chrom_ids)
+    i = np.arange(len(chrom_ids))
+    rad_a = (i - 1) * dtheta + pad / 2
+    rad_b = i * dtheta - pad / 2
+    ax = js_round(radius * np.cos(rad_a) + cx)
+    ay = js_round(radius * np.sin(rad_a) + cy)
+    bx = js_round(radius * np.cos(rad_b) + cx)
+    by = js_round(radius * np.sin(rad_b) + cy)
+    px_len = np.hypot(ax - bx, ay - by)
+    delta_x = (bx - ax) / chrom_lens
+    delta_y = (by - ay) / chrom_lens
+    bp_per_px = chrom_lens / px_len
+    chrom_nodes = [{
+        'group': 'nodes',
+        'data': {
+            'id': chrom,
+            'type': 'chrom',
+            'start': 0,
+            'end': int(chrom_lens[k]),
+            'len': float(px_len[k]),
+            'theta': float((rad_a[k] + rad_b[k]) / 2),
+            'radWidth': rad_width
+        },
+        'position': {
+            'x': float(js_round((ax[k] + bx[k]) / 2)),
+            'y': float(js_round((ay[k] + by[k]) / 2))
+        }
+    } for k, chrom in enumerate(chrom_ids)]
+
+    # Group the SNPs closer than a node along the chromosome
+    chrom_index = {x: k for k, x in enumerate(chrom_ids)}
+    groups = []
+    group_of = np.zeros(len(snps), dtype=np.int64)
+    total = 0
+    last = 0
+    for k, snp in enumerate(snps):
+        total += vpos[k] - last
+        last = vpos[k]
+        if (not groups or snp['chrom'] != groups[-1]['chrom'] or
+                total >= node_diameter *
+                bp_per_px[chrom_index[groups[-1]['chrom']]]):
+            total = 0
+            groups.append({
+                'id': 'SNPG:{}'.format(len(groups)),
+                'type': 'snpG',
+                'chrom': snp['chrom'],
+                'start': float(last),
+                'end': float(last),
+                'snps': []
+            })
+        groups[-1]['end'] = float(last)
+        groups[-1]['snps'].append(snp['id'])
+        group_of[k] = len(groups) - 1
+
+    # Place the groups on their chromosome
+    chrom_of = np.array([chrom_index[x['chrom']] for x in groups])
+    gpos = np.array([(x['start'] + x['end']) / 2 for x in groups])
+    gx = js_round(gpos * delta_x[chrom_of] + ax[chrom_of])
+    gy = js_round(gpos * delta_y[chrom_of] + ay[chrom_of])
+    theta = np.arctan2(gy - cy, gx - cx)
+    coef_x = np.cos(theta) * node_diameter
+    coef_y = np.sin(theta) * node_diameter
+    group_nodes = [{
+        'group': 'nodes',
+        'data': dict(group, pos=float(gpos[k])),
+        'position': {
+            'x': float(gx[k]),
+            'y': float(gy[k])
+        }
+    } for k, group in enumerate(groups)]
+
+    # Stack the genes of each SNP outwards from its group, the SNPs with the
+    # most connected genes first
+    sizes = np.array([len(x['genes']) for x in snps], dtype=np.int64)
+    top = np.array([degree[x['genes'][0]] for x in snps])
+    placed = np.argsort(-top, kind='stable')
+    by_group = placed[np.argsort(group_of[placed], kind='stable')]
+    grp = group_of[by_group]
+    starts = np.r_[True, grp[1:] != grp[:-1]]
+    nth = np.arange(len(grp)) - np.repeat(
+        np.flatnonzero(starts), np.diff(np.r_[np.flatnonzero(starts),
+                                               len(grp)]))
+    # Offset before each SNP is the genes and gaps of the SNPs placed before it
+    used = np.cumsum(sizes[by_group] + 1)
+    offset = np.empty(len(snps), dtype=np.int64)
+    offset[by_group] = used - (sizes[by_group] + 1) - np.repeat(
+        np.r_[0, used][np.flatnonzero(starts)],
+        np.diff(np.r_[np.flatnonzero(starts), len(grp)]))
+    level = np.empty(len(snps), dtype=np.int64)
+    level[by_group] = nth % snp_levels
+
+    genes = {}
+    for k, snp in enumerate(snps):
+        g = group_of[k]
+        for j, i in enumerate(snp['genes'], 1):
+            genes[ids[i]] = {
+                'position': {
+                    'x': float(js_round((offset[k] + j) * coef_x[g] + gx[g])),
+                    'y': float(js_round((offset[k] + j) * coef_y[g] + gy[g]))
+                },
+                'classes': 'snp{}'.format(level[k])
+            }
+    return {'chroms': chrom_nodes, 'snpGroups': group_nodes, 'genes': genes}
@@ -0,0 +1,142 @@
+#!/usr/bin/python3
+
+import sys
+import json
+import time
+import queue
+import threading
+import numpy as np
+import urllib.error
+import urllib.parse
+import urllib.request
+from flask import request
+
+# The routes worth recording, the ones that do real work
+RECORDED_ROUTES = ('/term_network', '/custom_network', '/gene_connections',
+                   '/gene_word_search', '/go_enrichment')
+
+
+# --------------------------------------------
+#     Recording Requests on the Server
+# --------------------------------------------
+class RequestLog(object):
+    def __init__(self, app, filename):
+        self.filename = filename
+        self.lock = threading.Lock()
+        app.before_request(self._record)
+
+    def _record(self):
+        if request.method != 'POST' or request.path not in RECORDED_ROUTES:
+            return
+        # Requests the server makes to warm its own caches aren't recorded
+        if request.environ.get('cob.warmup'):
+            return
+        line = json.dumps({
+            'time': time.time(),
+            'method': request.method,
+            'path': request.path,
+            'form': request.form.to_dict()
+        })
+        with self.lock:
+            with open(self.filename, 'a') as log:
+                log.write(line + '\n')
+
+
+def read_log(filename):
+    reqs = []
+    with open(filename) as log:
+        for line in log:
+            line = line.strip()
+            if line:
+                reqs.append(json.loads(line))
+    return reqs
+
+
+# --------------------------------------------
+#     Replaying Requests Against a Server
+# --------------------------------------------
+def _send(target, req, timeout):
+    data = urllib.parse.urlencode(req.get('form', {})).encode()
+    url = target.rstrip('/') + req['path']
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, data=data, timeout=timeout) as resp:
+            resp.read()
+            status = resp.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except (urllib.error.URLError, OSError):
+        status = None
+    return status, time.perf_counter() - start
+
+
+def replay(reqs, target, concurrency=4, rate=0, timeout=300):
+    todo = queue.Queue()
+    results = []
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            req = todo.get()
+            if req is None:
+                return
+            status, dur = _send(target, req, timeout)
+            with lock:
+                results.append((req['path'], status, dur))
+
+    workers = [
+        threading.Thread(target=worker, daemon=True)
+        for i in range(concurrency)
+    ]
+    for w in workers:
+        w.start()
+
+    # Feed the workers, pacing the requests if there is a rate
+    start = time.perf_counter()
+    for i, req in enumerate(reqs):
+        if rate > 0:
+            wait = start + i / rate - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+        todo.put(req)
+    for w in workers:
+        todo.put(None)
+    for w in workers:
+        w.join()
+    return results, time.perf_counter() - start
+
+
+def summarize(results, elapsed):
+    routes = {}
+    for path, status, dur in results:
+        routes.setdefault(path, []).append((status, dur))
+    if results:
+        routes['all'] = [(status, dur) for path, status, dur in results]
+
+    summary = {}
+    for route, res in routes.items():
+        durs = np.array([dur for status, dur in res]) * 1000
+        errors = sum(1 for status, dur in res
+                     if status is None or status >= 400)
+        summary[route] = {
+            'requests': len(res),
+            'errors': errors,
+            'error_rate': errors / len(res),
+            'p50_ms': float(np.percentile(durs, 50)),
+            'p95_ms': float(np.percentile(durs, 95)),
+            'p99_ms': float(np.percentile(durs, 99)),
+            'throughput': len(res) / elapsed
+        }
+    return summary
+
+
+def report(summary, out=sys.stdout):
+    head = '{:<20} {:>8} {:>8} {:>9} {:>9} {:>9} {:>8}'.format(
+        'route', 'requests', 'errors', 'p50 ms', 'p95 ms', 'p99 ms', 'req/s')
+    print(head, file=out)
+    print('-' * len(head), file=out)
+    for route, res in summary.items():
+        print(('{:<20} {requests:>8} {error_rate:>8.1%} {p50_ms:>9.1f} '
+               '{p95_ms:>9.1f} {p99_ms:>9.1f} {throughput:>8.2f}').format(
+                   route, **res),
+              file=out)
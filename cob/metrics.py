@@ -0,0 +1,168 @@
+#!/usr/bin/python3
+
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from flask import g, request
+
+# Upper bounds (in seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0, 30.0, 60.0, 120.0, 300.0)
+
+# Upper bounds (in bytes) of the payload size histogram buckets
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304,
+                16777216, 67108864)
+
+
+# --------------------------------------------
+#     Simple Cumulative Histogram
+# --------------------------------------------
+class Histogram(object):
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, val):
+        self.counts[bisect_left(self.buckets, val)] += 1
+        self.sum += val
+        self.count += 1
+
+    # Yields (upper bound, cumulative count) pairs, ending with +Inf
+    def cumulative(self):
+        total = 0
+        for bound, num in zip(self.buckets + (float('inf'), ), self.counts):
+            total += num
+            yield bound, total
+
+
+# --------------------------------------------
+#     Per Stage Timing and Route Metrics
+# --------------------------------------------
+class Metrics(object):
+    def __init__(self, app=None):
+        self.lock = threading.Lock()
+        self.latency = {}
+        self.stages = {}
+        self.payload = {}
+        self.responses = {}
+        self.cache = {}
+        if app is not None:
+            self.init_app(app)
+
+    # Hook the request lifecycle of the flask app
+    def init_app(self, app):
+        app.before_request(self._start)
+        app.after_request(self._finish)
+
+    def _start(self):
+        g.cob_start = time.perf_counter()
+        g.cob_stages = {}
+
+    def _finish(self, response):
+        # Requests that failed before the start hook have nothing to report
+        if 'cob_start' not in g:
+            return response
+        total = time.perf_counter() - g.cob_start
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        size = response.calculate_content_length()
+
+        with self.lock:
+            self._hist(self.latency, route, LATENCY_BUCKETS).observe(total)
+            for stage, dur in g.cob_stages.items():
+                self._hist(self.stages, (route, stage),
+                           LATENCY_BUCKETS).observe(dur)
+            if size is not None:
+                self._hist(self.payload, route, SIZE_BUCKETS).observe(size)
+            key = (route, str(response.status_code))
+            self.responses[key] = self.responses.get(key, 0) + 1
+
+        # Report the breakdown to the client as well
+        timings = [
+            '{};dur={:.1f}'.format(stage, dur * 1000)
+            for stage, dur in g.cob_stages.items()
+        ]
+        timings.append('total;dur={:.1f}'.format(total * 1000))
+        response.headers['Server-Timing'] = ', '.join(timings)
+        return response
+
+    @staticmethod
+    def _hist(db, key, buckets):
+        if key not in db:
+            db[key] = Histogram(buckets)
+        return db[key]
+
+    # Time a named stage of the current request, repeated stages add up
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            dur = time.perf_counter() - start
+            try:
+                stages = g.cob_stages
+            except (AttributeError, RuntimeError):
+                # Not in a request (e.g. warming at startup), nothing to track
+                pass
+            else:
+                stages[name] = stages.get(name, 0.0) + dur
+
+    # Count a hit or miss for a named cache
+    def cache_lookup(self, name, hit):
+        key = (name, 'hit' if hit else 'miss')
+        with self.lock:
+            self.cache[key] = self.cache.get(key, 0) + 1
+
+    # Render everything in the Prometheus text exposition format
+    def render(self):
+        lines = []
+        with self.lock:
+            self._render_hist(lines, 'cob_request_duration_seconds',
+                              'Request latency per route.', self.latency,
+                              ('route', ))
+            self._render_hist(lines, 'cob_stage_duration_seconds',
+                              'Latency of each stage per route.', self.stages,
+                              ('route', 'stage'))
+            self._render_hist(lines, 'cob_response_size_bytes',
+                              'Response payload size per route.',
+                              self.payload, ('route', ))
+            self._render_counter(lines, 'cob_responses_total',
+                                 'Responses per route and status code.',
+                                 self.responses, ('route', 'status'))
+            self._render_counter(lines, 'cob_cache_lookups_total',
+                                 'Cache lookups per cache and result.',
+                                 self.cache, ('cache', 'result'))
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _labels(names, vals, extra=None):
+        if not isinstance(vals, tuple):
+            vals = (vals, )
+        pairs = list(zip(names, vals))
+        if extra:
+            pairs.append(extra)
+        return ','.join('{}="{}"'.format(k,
+                                         str(v).replace('\\', '\\\\').replace(
+                                             '"', '\\"')) for k, v in pairs)
+
+    def _render_hist(self, lines, name, desc, db, names):
+        lines.append('# HELP {} {}'.format(name, desc))
+        lines.append('# TYPE {} histogram'.format(name))
+        for key, hist in sorted(db.items()):
+            for bound, num in hist.cumulative():
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append('{}_bucket{{{}}} {}'.format(
+                    name, self._labels(names, key, ('le', le)), num))
+            labels = self._labels(names, key)
+            lines.append('{}_sum{{{}}} {}'.format(name, labels, hist.sum))
+            lines.append('{}_count{{{}}} {}'.format(name, labels, hist.count))
+
+    def _render_counter(self, lines, name, desc, db, names):
+        lines.append('# HELP {} {}'.format(name, desc))
+        lines.append('# TYPE {} counter'.format(name))
+        for key, num in sorted(db.items()):
+            lines.append('{}{{{}}} {}'.format(name, self._labels(names, key),
+                                              num))
@@ -0,0 +1,143 @@
+#!/usr/bin/python3
+
+import os
+import sys
+import time
+import types
+import cProfile
+import resource
+import threading
+import numpy as np
+import pandas as pd
+from contextlib import contextmanager
+
+
+# Resident memory of this process in bytes, the peak where /proc isn't around
+def rss():
+    try:
+        with open('/proc/self/statm') as fd:
+            return int(fd.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+# Approximate memory held by an object and everything it refers to, each object
+# counted once. Pandas objects count their deep memory usage, numpy arrays
+# their buffers, and memory mapped arrays nothing, as those pages belong to the
+# file. Modules, classes and functions aren't followed.
+def deep_size(obj, seen=None):
+    if seen is None:
+        seen = set()
+    size = 0
+    todo = [obj]
+    while todo:
+        obj = todo.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        if isinstance(obj, (type, types.ModuleType, types.FunctionType,
+                            types.BuiltinFunctionType, types.MethodType)):
+            continue
+        if isinstance(obj, np.memmap):
+            continue
+        if isinstance(obj, np.ndarray):
+            size += sys.getsizeof(obj)
+            if not obj.flags.owndata:
+                size += obj.nbytes
+            if obj.dtype == object:
+                todo.extend(obj.ravel().tolist())
+            continue
+        if isinstance(obj, pd.DataFrame):
+            size += int(obj.memory_usage(deep=True).sum())
+            continue
+        if isinstance(obj, (pd.Series, pd.Index)):
+            size += int(obj.memory_usage(deep=True))
+            continue
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            todo.extend(obj.keys())
+            todo.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            todo.extend(obj)
+        else:
+            if hasattr(obj, '__dict__'):
+                todo.append(obj.__dict__)
+            for slot in getattr(type(obj), '__slots__', ()):
+                if hasattr(obj, slot):
+                    todo.append(getattr(obj, slot))
+    return size
+
+
+# --------------------------------------------
+#     Timing of the Server Startup Phases
+# --------------------------------------------
+# Wall time, CPU time and the change in resident memory of each named phase,
+# nested phases (e.g. each dataset within the networks) are reported indented
+# under the one they're in. Only the thread that started the profile records
+# anything, so the phases are a no-op outside of the startup.
+class StartupProfile(object):
+    def __init__(self):
+        self.rows = []
+        self.depth = 0
+        self.thread = None
+        self.profiler = None
+        self.started = None
+
+    def start(self, dump=False):
+        self.thread = threading.get_ident()
+        self.started = (time.perf_counter(), time.process_time(), rss())
+        if dump:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    @contextmanager
+    def phase(self, name):
+        if self.thread != threading.get_ident():
+            yield
+            return
+        row = {'name': name, 'depth': self.depth}
+        self.rows.append(row)
+        self.depth += 1
+        wall, cpu, mem = time.perf_counter(), time.process_time(), rss()
+        try:
+            yield
+        finally:
+            self.depth -= 1
+            row['wall'] = time.perf_counter() - wall
+            row['cpu'] = time.process_time() - cpu
+            row['rss'] = rss() - mem
+
+    # Stop recording and write the report (and the cProfile dump) to the
+    # folder, returns the path of the report
+    def finish(self, folder):
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.profiler.dump_stats(os.path.join(folder, 'startup.prof'))
+        wall, cpu, mem = self.started
+        self.rows.append({
+            'name': 'total',
+            'depth': 0,
+            'wall': time.perf_counter() - wall,
+            'cpu': time.process_time() - cpu,
+            'rss': rss() - mem
+        })
+        self.thread = None
+
+        path = os.path.join(folder, 'startup_profile.txt')
+        with open(path, 'w') as fd:
+            fd.write(self.report())
+        return path
+
+    def report(self):
+        width = max([len(x['name']) + 2 * x['depth'] for x in self.rows] + [5])
+        lines = [
+            '{:<{}} {:>10} {:>10} {:>12}'.format('phase', width, 'wall s',
+                                                 'cpu s', 'rss MB')
+        ]
+        lines.append('-' * len(lines[0]))
+        for row in self.rows:
+            lines.append('{:<{}} {:>10.2f} {:>10.2f} {:>+12.1f}'.format(
+                '  ' * row['depth'] + row['name'], width, row['wall'],
+                row['cpu'], row['rss'] / 2**20))
+        lines.append('RSS at the end: {:.1f} MB'.format(rss() / 2**20))
+        return '\n'.join(lines) + '\n'
@@ -10,19 +10,41 @@ import glob
 import time
 import yaml
 import logging
+import hmac
 import threading
+import tracemalloc
+import multiprocessing
 import numpy as np
 import pandas as pd
 import camoco as co
 from math import isinf
+from functools import wraps
 from itertools import chain
-from flask import Flask, url_for, jsonify, request, send_from_directory, abort
+from collections import Counter
+from flask import (Flask, Response, url_for, jsonify, request,
+                   send_from_directory, abort, stream_with_context)
+from cob.metrics import Metrics
+from cob.loadtest import RequestLog, read_log
+from cob.cache import LRUCache
+from cob.coex import (block_edges, subset_edges, density, SortedEdges,
+                      DegreeTable, Adjacency)
+from cob.intervals import GeneIntervals
+from cob.flight import Busy, SingleFlight, Admission
+from cob.profiling import StartupProfile, deep_size, rss
+from cob import termstats
+from cob.termstats import TermStats
+from cob import compare
+from cob import export
+from cob import layout
 
 print('Loading Camoco...')
 
 # Take a huge swig from the flask
 app = Flask(__name__, static_folder=None)
 
+# Time the stages of every request, reported at /metrics
+metrics = Metrics(app)
+
 # Try Importing GWS
 try:
     from genewordsearch.Classes import WordFreq
@@ -36,8 +58,12 @@ except ImportError:
 # ----------------------------------------
 #   Parse configuration from environment
 # ----------------------------------------
-# Get the config object
-conf = yaml.safe_load(os.getenv('COB_CONF'))
+# Get the config object, from the file the launcher wrote if there is one
+if os.getenv('COB_CONF_FILE'):
+    with open(os.getenv('COB_CONF_FILE')) as fd:
+        conf = yaml.safe_load(fd)
+else:
+    conf = yaml.safe_load(os.getenv('COB_CONF'))
 dflt = conf['defaults']
 
 # Folder with annotation files
@@ -45,10 +71,60 @@ os.makedirs(conf['scratch'], exist_ok=True)
 if hasGWS:
     os.environ['GWS_STORE'] = conf['scratch']
 
+# Record the heavy requests for replaying with `cob --loadtest`
+if conf['requestLog']:
+    RequestLog(app, os.path.join(conf['scratch'], conf['requestLog']))
+
+# Summaries of the network each term renders at the defaults, for the terms
+termStats = None
+if conf['termStats']:
+    termStats = TermStats(
+        os.path.join(conf['scratch'], conf['termStats']), {
+            x: dflt[x]
+            for x in ('nodeCutoff', 'edgeCutoff', 'fdrFilter', 'fdrCutoff',
+                      'windowSize', 'flankLimit', 'overlapSNPs',
+                      'overlapMethod')
+        })
+
 # Folder for bundle files
 static_bundle_dir = os.path.join(conf['scratch'], 'static')
 os.makedirs(static_bundle_dir, exist_ok=True)
 
+# Score sorted edges of recently built networks, for quick cutoff changes
+edge_index = LRUCache('edgeIndex', conf['cacheSize'], metrics)
+
+# Candidate genes of recent term searches, shared by networks on a RefGen
+candidate_cache = LRUCache('candidates', conf['cacheSize'], metrics)
+
+# Identical heavy requests running at the same time share one computation
+flights = SingleFlight()
+
+# Bound on the heavy computations running on each network at once
+admission = Admission(conf['heavyLimit'], conf['heavyQueue'],
+                      conf['heavyTimeout'])
+
+# Process pool for comparing a term across networks, forked on first use
+compare_pool = None
+compare_lock = threading.Lock()
+
+# Polywas layouts of recent networks, by the query that built them
+layout_cache = LRUCache('layouts', conf['cacheSize'], metrics)
+
+# High priority candidates of each Overlap by (COB, Ontology, Term)
+hpo_index = {}
+
+# The Overlap result columns the server reads, the rest are dropped on loading
+overlap_columns = {
+    'COB': 'category',
+    'Term': 'category',
+    'WindowSize': np.int32,
+    'FlankLimit': np.int32,
+    'SNP2Gene': 'category',
+    'Method': 'category',
+    'gene': 'category',
+    'fdr': np.float32
+}
+
 # Max number of genes for custom queries
 geneLimit = {'min': 1, 'max': 150}
 
@@ -159,9 +235,9 @@ js_files = [
     'lib/jquery-3.3.1.min.js', 'lib/jquery.textcomplete-1.8.1.min.js',
     'lib/bootstrap-3.3.7.min.js', 'lib/datatables-1.10.18.min.js',
     'lib/qtip-3.0.3.min.js', 'lib/download-1.4.5.min.js',
-    'lib/cytoscape-3.4.0.min.js', 'lib/cytoscape-qtip-2.7.1.js',
-    'lib/cytoscape-graphml-1.0.5.js', 'core.js', 'genes.js', 'graph.js',
-    'polywas-layout.js', 'enrichment.js', 'tools.js', 'tables.js', 'cob.js'
+    'lib/cytoscape-3.4.0.min.js', 'lib/cytoscape-qtip-2.7.1.js', 'core.js',
+    'genes.js', 'graph.js', 'polywas-layout.js', 'enrichment.js', 'tools.js',
+    'tables.js', 'cob.js'
 ]
 
 # Enumerate the CSS files
@@ -189,125 +265,569 @@ bundle_files(css_files, 'css')
 # ----------------------------------------
 #    Load things to memeory to prepare
 # ----------------------------------------
-# Generate network list based on allowed list
-print('Preloading networks into memory...')
-if len(conf['networks']) < 1:
-    conf['networks'] = list(co.Tools.available_datasets('Expr')['Name'].values)
-networks = {x: co.COB(x) for x in conf['networks']}
-
+# These are all filled in by loadDatasets, in the background unless the app is
+# preloaded, so the server can answer requests while the datasets load
+networks = {}
 network_info = []
 refLinks = {}
-for name, net in networks.items():
-    network_info.append({
-        'name': net.name,
-        'refgen': net._global('parent_refgen'),
-        'desc': net.description,
-    })
-    if net._global('parent_refgen') in conf['refLinks']:
-        refLinks[net.name] = conf['refLinks'][net._global('parent_refgen')]
-print('Availible Networks: ' + str(networks))
-
-# Generate ontology list based on allowed list and load them into memory
-print('Preloading GWASes into Memory...')
-if len(conf['gwas']) < 1:
-    conf['gwas'] = list(co.Tools.available_datasets('GWAS')['Name'].values)
-onts = {x: co.GWAS(x) for x in conf['gwas']}
+# The degree table, sparse adjacency and gene names of each network, with the
+# copy of the network they were built from, swapped in together on a reload
+network_data = {}
+gene_intervals = {}
+onts = {}
 onts_info = {}
-for m, net in networks.items():
-    ref = net._global('parent_refgen')
-    onts_info[net.name] = []
-    for n, ont in onts.items():
-        if ont.refgen.name == ref:
-            onts_info[net.name].append({
-                'name': ont.name,
-                'refgen': ont.refgen.name,
-                'desc': ont.description
-            })
-print('Availible GWASes: ' + str(onts_info))
-
-# Prefetch the gene names for all the networks
-print('Fetching gene names for networks...')
-network_genes = {}
-for name, net in networks.items():
-    ids = list(net._expr.index.values)
-    als = co.RefGen(net._global('parent_refgen')).aliases(ids)
-    for k, v in als.items():
-        ids += v
-    network_genes[name] = list(set(ids))
-print('Found gene names')
-
-# Find all of the GWAS data we have available
-print('Finding GWAS Data...')
 gwas_data_db = {}
-for gwas in co.Tools.available_datasets('Overlap')['Name']:
-    print("Loading {}".format(gwas))
-    gwas_data_db[gwas] = co.Overlap(gwas)
-
-# Find the available window sizes and flank limits for each GWAS/COB combo
-print('Finding GWAS Metadata...')
 gwas_meta_db = {}
-for ont in gwas_data_db.keys():
-    gwas_meta_db[ont] = {}
-    for net in gwas_data_db[ont].results['COB'].unique():
-        gwas_meta_db[ont][net] = {}
-        gwas = gwas_data_db[ont].results[gwas_data_db[ont].results['COB'] ==
-                                         net]
-        gwas_meta_db[ont][net]['windowSize'] = []
-        gwas_meta_db[ont][net]['flankLimit'] = []
-        gwas_meta_db[ont][net]['overlapSNPs'] = []
-        gwas_meta_db[ont][net]['overlapMethod'] = []
-        for x in gwas['WindowSize'].unique():
-            gwas_meta_db[ont][net]['windowSize'].append(int(x))
-        for x in gwas['FlankLimit'].unique():
-            gwas_meta_db[ont][net]['flankLimit'].append(int(x))
-        for x in gwas['SNP2Gene'].unique():
-            gwas_meta_db[ont][net]['overlapSNPs'].append(
-                str(x).strip().lower())
-        for x in gwas['Method'].unique():
-            gwas_meta_db[ont][net]['overlapMethod'].append(
-                str(x).strip().lower())
-
-# Find any functional annotations we have
-print('Finding functional annotations...')
+terms = {}
 func_data_db = {}
-for ref in co.Tools.available_datasets('RefGen')['Name']:
-    refgen = co.RefGen(ref)
-    if refgen.has_annotations():
-        print('Processing annotations for {}...'.format(ref))
-        func_data_db[ref] = refgen
-        func_data_db[ref].export_annotations(
-            os.path.join(conf['scratch'], (ref + '.tsv')))
-        if hasGWS:
-            geneWordBuilder(ref,
-                            [os.path.join(conf['scratch'], (ref + '.tsv'))],
-                            [1], ['2 end'], ['tab'], [True])
-
-# Find any GO ontologies we have for the networks we have
-print('Finding applicable GO Ontologies...')
 GOnt_db = {}
-for name in co.Tools.available_datasets('GOnt')['Name']:
-    gont = co.GOnt(name)
-    if gont.refgen.name not in GOnt_db:
-        GOnt_db[gont.refgen.name] = gont
 
-# Generate in memory term lists
-print('Finding all available terms...')
-terms = {}
-for name, ont in onts.items():
-    terms[name] = []
-    for term in ont.iter_terms():
-        terms[name].append({
-            'name':
-            term.id,
-            'desc':
-            term.desc,
-            'snps':
-            len(term.loci),
-            'genes':
-            len(
-                ont.refgen.candidate_genes(
-                    term.effective_loci(window_size=50000)))
-        })
+# Loading state of each dataset, one of 'waiting', 'loading', 'ready' or
+# 'failed', and whether everything is done
+status = {'networks': {}, 'ontologies': {}, 'annotations': 'waiting'}
+loaded = threading.Event()
+
+# Version of each loaded camoco dataset by (type, name), to spot the ones that
+# changed on disk, and whether all the networks and GWASes camoco has are
+# served, so new ones get picked up too
+versions = {}
+serveAll = {'networks': not conf['networks'], 'gwas': not conf['gwas']}
+
+# Time and memory of each loading phase, with `cob --profile-startup`
+startup = StartupProfile()
+
+# Last tracemalloc snapshot taken by /debug/memory, to compare the next one to
+traces = {'snapshot': None, 'lock': threading.Lock()}
+
+# Pid of the process watching the datasets, the watcher thread doesn't survive
+# the fork into the gunicorn workers, so each process starts its own
+watcher = {'pid': None, 'lock': threading.Lock()}
+
+# Pid of the process summarizing the terms, started in the serving processes
+# for the same reason, and so a preloaded master doesn't hold the table's locks
+# when the workers fork
+summarizer = {'pid': None, 'lock': threading.Lock()}
+
+
+def loadDatasets():
+    if conf['profileStartup']:
+        startup.start(conf['profileDump'])
+
+    # Generate network and ontology lists based on allowed lists
+    if len(conf['networks']) < 1:
+        conf['networks'] = list(
+            co.Tools.available_datasets('Expr')['Name'].values)
+    if len(conf['gwas']) < 1:
+        conf['gwas'] = list(co.Tools.available_datasets('GWAS')['Name'].values)
+    for name in conf['networks']:
+        status['networks'][name] = 'waiting'
+    for name in conf['gwas']:
+        status['ontologies'][name] = 'waiting'
+
+    # Each network can be used as soon as it is loaded
+    print('Preloading networks into memory...')
+    with startup.phase('networks'):
+        for name in conf['networks']:
+            loadStep('networks', name, loadNetwork)
+    print('Availible Networks: ' + str(networks))
+
+    # Then the GWASes, along with their Overlap results and terms
+    print('Preloading GWASes into Memory...')
+    overlaps = set(co.Tools.available_datasets('Overlap')['Name'])
+    with startup.phase('ontologies'):
+        for name in conf['gwas']:
+            loadStep('ontologies', name,
+                     lambda x: loadOntology(x, x in overlaps))
+    print('Availible GWASes: ' + str(onts_info))
+
+    # The enrichment data is only needed once there are networks
+    status['annotations'] = 'loading'
+    try:
+        with startup.phase('annotations'):
+            loadAnnotations()
+    except Exception:
+        app.logger.exception('Failed loading annotations')
+        status['annotations'] = 'failed'
+    else:
+        status['annotations'] = 'ready'
+    print('All Ready!')
+    loaded.set()
+
+    # Run the most requested terms so their results are cached
+    if conf['warmTerms'] and conf['requestLog']:
+        with startup.phase('warm caches'):
+            warmCaches(conf['warmTerms'])
+
+    if conf['profileStartup']:
+        report = startup.finish(conf['scratch'])
+        print(startup.report())
+        print('Startup profile written to ' + report)
+
+
+# Load one dataset, keeping track of its state
+def loadStep(kind, name, load):
+    status[kind][name] = 'loading'
+    try:
+        with startup.phase(name):
+            load(name)
+    except Exception:
+        app.logger.exception('Failed loading {}'.format(name))
+        status[kind][name] = 'failed'
+    else:
+        status[kind][name] = 'ready'
+
+
+def loadNetwork(name):
+    print('Loading {}...'.format(name))
+    # The version read before loading, so changes made meanwhile reload again
+    version = datasetVersion('Expr', name)
+    net = co.COB(name)
+    ref = net._global('parent_refgen')
+
+    # Precompute the global degree of the genes at the common edge cutoffs
+    print('Precomputing degree tables...')
+    with startup.phase('degree table'):
+        degree_table = DegreeTable(
+            net, conf['degreeCutoffs'] + [dflt['edgeCutoff']])
+
+    # Build the sparse adjacency of the significant edges
+    adjacency = None
+    if conf['adjacencyCutoff']:
+        print('Building sparse adjacency...')
+        folder = None
+        if conf['adjacencyMmap']:
+            folder = os.path.join(conf['scratch'], 'adjacency', name)
+        with startup.phase('adjacency'):
+            adjacency = Adjacency.from_cob(
+                net, float(conf['adjacencyCutoff']), folder)
+        print('{}: {:.1f} MB of edges'.format(name, adjacency.nbytes / 2**20))
+
+    # Prefetch the gene names
+    print('Fetching gene names...')
+    with startup.phase('gene names'):
+        ids = list(net._expr.index.values)
+        als = co.RefGen(ref).aliases(ids)
+        for k, v in als.items():
+            ids += v
+
+    # Index the gene positions of the RefGen for the candidate searches
+    if net.refgen.name not in gene_intervals:
+        with startup.phase('gene intervals'):
+            gene_intervals[net.refgen.name] = GeneIntervals(net.refgen)
+
+    # Swap it all in, the network itself last so requests only find it once
+    # everything it needs is there. Requests already running on a previous
+    # copy keep the objects they were handed.
+    network_data[name] = {
+        'cob': net,
+        'degreeTable': degree_table,
+        'adjacency': adjacency,
+        'genes': list(set(ids))
+    }
+    onts_info[name] = [ontInfo(ont) for ont in list(onts.values())
+                       if ont.refgen.name == ref]
+    if ref in conf['refLinks']:
+        refLinks[name] = conf['refLinks'][ref]
+    network_info[:] = replaceInfo(network_info, {
+        'name': net.name,
+        'refgen': ref,
+        'desc': net.description,
+    })
+    networks[name] = net
+
+    # Only now is it current, a load that failed is tried again
+    versions[('Expr', name)] = version
+
+
+def loadOntology(name, hasOverlap):
+    print('Loading {}...'.format(name))
+    version = datasetVersion('GWAS', name)
+    overlapVersion = datasetVersion('Overlap', name) if hasOverlap else None
+    with startup.phase('gwas'):
+        ont = co.GWAS(name)
+    if ont.refgen.name not in gene_intervals:
+        with startup.phase('gene intervals'):
+            gene_intervals[ont.refgen.name] = GeneIntervals(ont.refgen)
+
+    # Find the GWAS data we have available
+    overlap = None
+    if hasOverlap:
+        print('Finding GWAS Data...')
+        with startup.phase('overlap'):
+            overlap = co.Overlap(name)
+
+        # The high priority candidates need the full results, index them first
+        with startup.phase('hpo index'):
+            hpo = indexHPO(overlap)
+        with startup.phase('compact results'):
+            compactResults(overlap)
+
+        # Find the available window sizes and flank limits for each COB
+        print('Finding GWAS Metadata...')
+        with startup.phase('metadata'):
+            meta = overlapMeta(overlap.results)
+
+    # Generate in memory term list
+    print('Finding all available terms...')
+    with startup.phase('terms'):
+        ont_terms = list(ont.iter_terms())
+        counts = gene_intervals[ont.refgen.name].count(
+            [term.effective_loci(window_size=50000) for term in ont_terms])
+
+    # Swap it all in, the ontology itself last
+    if overlap is not None:
+        hpo_index[name] = hpo
+        gwas_data_db[name] = overlap
+        gwas_meta_db[name] = meta
+    terms[name] = [{
+        'name': term.id,
+        'desc': term.desc,
+        'snps': len(term.loci),
+        'genes': count
+    } for term, count in zip(ont_terms, counts)]
+    onts[name] = ont
+
+    # Offer it for the loaded networks on the same RefGen
+    for net in list(networks.values()):
+        if ont.refgen.name == net._global('parent_refgen'):
+            onts_info[net.name] = replaceInfo(onts_info[net.name],
+                                              ontInfo(ont))
+
+    # Only now is it current, a load that failed is tried again
+    versions[('GWAS', name)] = version
+    versions[('Overlap', name)] = overlapVersion
+
+
+# The window sizes, flank limits and methods in the Overlap results of each COB
+def overlapMeta(results):
+    meta = {}
+    for net in results['COB'].unique():
+        gwas = results[results['COB'] == net]
+        meta[net] = {
+            'windowSize': [int(x) for x in gwas['WindowSize'].unique()],
+            'flankLimit': [int(x) for x in gwas['FlankLimit'].unique()],
+            'overlapSNPs':
+            [str(x).strip().lower() for x in gwas['SNP2Gene'].unique()],
+            'overlapMethod':
+            [str(x).strip().lower() for x in gwas['Method'].unique()]
+        }
+    return meta
+
+
+# How an ontology is listed for a network
+def ontInfo(ont):
+    return {
+        'name': ont.name,
+        'refgen': ont.refgen.name,
+        'desc': ont.description
+    }
+
+
+# A copy of a dataset list with the entry of the same name replaced, or added
+# to the end if it's new
+def replaceInfo(infos, info):
+    names = [x['name'] for x in infos]
+    if info['name'] not in names:
+        return infos + [info]
+    return [info if x['name'] == info['name'] else x for x in infos]
+
+
+# Shrink the Overlap results to the columns we read, in compact types
+def compactResults(overlap):
+    results = overlap.results
+    before = results.memory_usage(deep=True).sum()
+    results = results[[x for x in overlap_columns if x in results.columns]]
+    results = results.astype(
+        {k: v
+         for k, v in overlap_columns.items() if k in results.columns})
+    overlap.results = results
+    print('{}: Overlap results from {:.1f} MB to {:.1f} MB'.format(
+        overlap.name, before / 2**20,
+        results.memory_usage(deep=True).sum() / 2**20))
+
+
+def loadAnnotations():
+    # Find any functional annotations we have
+    print('Finding functional annotations...')
+    for ref in co.Tools.available_datasets('RefGen')['Name']:
+        refgen = co.RefGen(ref)
+        if refgen.has_annotations():
+            print('Processing annotations for {}...'.format(ref))
+            refgen.export_annotations(
+                os.path.join(conf['scratch'], (ref + '.tsv')))
+            if hasGWS:
+                geneWordBuilder(
+                    ref, [os.path.join(conf['scratch'], (ref + '.tsv'))], [1],
+                    ['2 end'], ['tab'], [True])
+            func_data_db[ref] = refgen
+
+    # Find any GO ontologies we have for the networks we have
+    print('Finding applicable GO Ontologies...')
+    for name in co.Tools.available_datasets('GOnt')['Name']:
+        gont = co.GOnt(name)
+        if gont.refgen.name not in GOnt_db:
+            GOnt_db[gont.refgen.name] = gont
+
+
+# Replay the most requested term networks from the request log
+def warmCaches(num):
+    logFile = os.path.join(conf['scratch'], conf['requestLog'])
+    if not os.path.exists(logFile):
+        return
+    counts = Counter(
+        tuple(sorted(req['form'].items())) for req in read_log(logFile)
+        if req['path'] == '/term_network')
+    print('Warming the caches with {} terms...'.format(
+        min(num, len(counts))))
+    client = app.test_client()
+    for form, count in counts.most_common(num):
+        client.post(
+            '/term_network',
+            data=dict(form),
+            environ_base={'cob.warmup': True})
+
+
+# Fill in the term summaries missing from the table, one term at a time, or
+# redo all of those of some reloaded datasets
+def summarizeTerms(only=None):
+    if not termStats.claim():
+        return
+    print('Summarizing terms...')
+    for ont in list(onts.values()):
+        for net in list(networks.values()):
+            if ont.refgen.name != net._global('parent_refgen'):
+                continue
+            if only is not None:
+                if net.name not in only and ont.name not in only:
+                    continue
+                done = {}
+            else:
+                done = termStats.get(net.name, ont.name)
+            for term in terms[ont.name]:
+                if term['name'] in done:
+                    continue
+                try:
+                    summary = summarizeTerm(net, ont, term['name'])
+                except Exception:
+                    app.logger.exception('Failed summarizing {} in {}'.format(
+                        term['name'], net.name))
+                    continue
+                termStats.add(net.name, ont.name, term['name'], summary)
+                # Let the request threads in between terms
+                time.sleep(0)
+    print('Terms summarized')
+
+
+# On disk version of a camoco dataset, the latest modification time of its
+# files in the camoco databases folder (0 if they can't be found there)
+def datasetVersion(kind, name):
+    if not conf['camocoDir']:
+        return 0
+    path = os.path.join(conf['camocoDir'], 'databases',
+                        glob.escape('{}.{}'.format(kind, name)))
+    mtimes = [0]
+    for found in glob.glob(path) + glob.glob(path + '.*'):
+        if os.path.isdir(found):
+            for root, dirs, files in os.walk(found):
+                mtimes += [
+                    os.path.getmtime(os.path.join(root, x)) for x in files
+                ]
+        mtimes.append(os.path.getmtime(found))
+    return max(mtimes)
+
+
+# Check the datasets every so often for ones that changed
+def watchDatasets():
+    while True:
+        time.sleep(conf['reloadInterval'])
+        try:
+            reloadDatasets()
+        except Exception:
+            app.logger.exception('Failed checking the datasets')
+
+
+# Load the new and changed datasets again, swapping them in as they're ready
+def reloadDatasets():
+    exprs = set(co.Tools.available_datasets('Expr')['Name'].values)
+    gwases = set(co.Tools.available_datasets('GWAS')['Name'].values)
+    overlaps = set(co.Tools.available_datasets('Overlap')['Name'].values)
+    if serveAll['networks']:
+        conf['networks'] += sorted(exprs - set(conf['networks']))
+    if serveAll['gwas']:
+        conf['gwas'] += sorted(gwases - set(conf['gwas']))
+
+    changed = []
+    for name in conf['networks']:
+        if name in exprs and outdated('Expr', name):
+            print('Reloading {}...'.format(name))
+            loadStep('networks', name, loadNetwork)
+            changed.append(name)
+    for name in conf['gwas']:
+        overlap = datasetVersion('Overlap', name) if name in overlaps else None
+        if name in gwases and (outdated('GWAS', name) or
+                               versions.get(('Overlap', name)) != overlap):
+            print('Reloading {}...'.format(name))
+            loadStep('ontologies', name,
+                     lambda x: loadOntology(x, x in overlaps))
+            changed.append(name)
+    if changed:
+        forgetDatasets(changed)
+
+
+# Whether a dataset is new or changed since it was loaded
+def outdated(kind, name):
+    return versions.get((kind, name)) != datasetVersion(kind, name)
+
+
+# Drop everything derived from the previous copies of reloaded datasets
+def forgetDatasets(names):
+    global compare_pool
+    names = set(names)
+    edge_index.evict(lambda key: key[0] in names)
+    candidate_cache.evict(lambda key: key[1] in names)
+    layout_cache.evict(lambda key: any(
+        k in ('network', 'ontology') and v in names for k, v in key[1:]))
+
+    # The pool workers opened the previous copies, let them finish what they're
+    # doing and start new ones
+    with compare_lock:
+        pool, compare_pool = compare_pool, None
+    if pool is not None:
+        pool.close()
+        pool.join()
+
+    # Their term summaries are out of date too
+    if termStats is not None and termStats.owner is not None:
+        threading.Thread(
+            target=summarizeTerms, args=(names, ), daemon=True).start()
+
+
+# Only requests with the adminToken in the X-Admin-Token header may use the
+# debug routes, wherever they come from, as a proxy on this host makes every
+# request look local
+def isAdmin():
+    token = request.headers.get('X-Admin-Token', '')
+    return bool(conf['adminToken']) and hmac.compare_digest(
+        str(token), str(conf['adminToken']))
+
+
+# The nodes and edges of a graph posted by the site for exporting, these are
+# read whole, unlike the networks built here
+def postedGraph(form):
+    try:
+        nodes = [{'data': data} for data in json.loads(form['nodes'])]
+        edges = tuple(json.loads(form['edges']))
+    except (KeyError, TypeError, ValueError):
+        abort(400)
+    if not all(isinstance(x['data'], dict) and 'id' in x['data']
+               for x in nodes):
+        abort(400)
+    if len(edges) != 3 or not all(
+            isinstance(x, list) and len(x) == len(edges[0]) for x in edges):
+        abort(400)
+    return nodes, edges
+
+
+# An integer query argument (or field of another form), a 400 unless it is
+# within the bounds
+def boundedArg(name, default, low, high, args=None):
+    if args is None:
+        args = request.args
+    try:
+        val = int(args.get(name, default))
+    except ValueError:
+        abort(400)
+    if val < low or val > high:
+        abort(400)
+    return val
+
+
+# Deep size in bytes of everything the server keeps per dataset and overall
+def memoryReport():
+    report = {'pid': os.getpid(), 'rss': rss(), 'networks': {}}
+    for name, data in list(network_data.items()):
+        cob, adj = data['cob'], data['adjacency']
+        report['networks'][name] = {
+            'expr': deep_size(cob._expr),
+            'coex': deep_size(getattr(cob, 'coex', None)),
+            'degreeTable': deep_size(data['degreeTable']),
+            'adjacency': deep_size(adj),
+            'adjacencyMapped': (adj.nbytes if adj is not None and isinstance(
+                adj.indices, np.memmap) else 0),
+            'geneNames': deep_size(data['genes'])
+        }
+    report['ontologies'] = {}
+    for name in list(onts):
+        overlap = gwas_data_db.get(name)
+        report['ontologies'][name] = {
+            'overlap':
+            deep_size(overlap.results) if overlap is not None else 0,
+            'hpoIndex': deep_size(hpo_index.get(name)),
+            'meta': deep_size(gwas_meta_db.get(name)),
+            'terms': deep_size(terms.get(name))
+        }
+    report['geneIntervals'] = {
+        name: deep_size(index)
+        for name, index in list(gene_intervals.items())
+    }
+    # Hold the locks while walking, so nothing is added or evicted meanwhile
+    report['caches'] = {}
+    for cache in (edge_index, candidate_cache, layout_cache):
+        with cache.lock:
+            report['caches'][cache.name] = {
+                'entries': len(cache),
+                'bytes': deep_size(cache.data)
+            }
+    if termStats is not None:
+        with termStats.lock:
+            report['termStats'] = deep_size(termStats.stats)
+    return report
+
+
+# The allocation sites that grew the most since the last snapshot
+def traceReport(top):
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        (tracemalloc.Filter(False, tracemalloc.__file__), ))
+    previous = traces['snapshot']
+    traces['snapshot'] = snapshot
+    if previous is None:
+        stats = snapshot.statistics('lineno')
+    else:
+        stats = snapshot.compare_to(previous, 'lineno')
+    current, peak = tracemalloc.get_traced_memory()
+    return {
+        'current': current,
+        'peak': peak,
+        'since': 'start' if previous is None else 'last snapshot',
+        'top': [{
+            'site': str(stat.traceback),
+            'size': stat.size,
+            'sizeDiff': getattr(stat, 'size_diff', stat.size),
+            'count': stat.count,
+            'countDiff': getattr(stat, 'count_diff', stat.count)
+        } for stat in stats[:top]]
+    }
+
+
+# Run a heavy route once for all the identical requests that come in while it
+# runs, within the limit on the computations running on its network
+def heavy(route):
+    @wraps(route)
+    def wrapper(*args, **kwargs):
+        key = (request.path, ) + tuple(
+            sorted((k, v.strip()) for k, v in request.form.items()))
+
+        def build():
+            with admission.slot(request.form.get('network', request.endpoint)):
+                resp = route(*args, **kwargs)
+            return resp.get_data(), resp.status_code, list(resp.headers)
+
+        # Each caller gets its own response, with the headers the route set
+        data, status_code, headers = flights.do(key, build)
+        return Response(data, status=status_code, headers=headers)
+
+    return wrapper
+
 
 # ---------------------------------------------
 #              Final Setup
@@ -317,12 +837,92 @@ handler.setLevel(logging.INFO)
 app.logger.addHandler(handler)
 app.logger.setLevel(logging.INFO)
 
-print('All Ready!')
 # ---------------------------------------------
 #                 Routes
 # ---------------------------------------------
 
 
+@app.before_request
+# Requests for datasets that are still loading are told to come back later
+def check_loaded():
+    if loaded.is_set():
+        return None
+    args = dict(request.view_args or {})
+    if request.method == 'POST':
+        args.update(request.form.to_dict())
+
+    pending = ('waiting', 'loading')
+    waiting = []
+    if status['networks'].get(args.get('network')) in pending:
+        waiting.append(args['network'])
+    if status['ontologies'].get(args.get('ontology')) in pending:
+        waiting.append(args['ontology'])
+    if request.endpoint in ('gene_word_search', 'go_enrichment') and status[
+            'annotations'] in pending:
+        waiting.append('annotations')
+    if waiting:
+        resp = jsonify({'loading': waiting})
+        resp.status_code = 503
+        resp.headers['Retry-After'] = '10'
+        return resp
+    return None
+
+
+@app.before_request
+# Start watching the datasets for changes in this process, once they're loaded.
+# Not for the cache warming requests, which a preloaded master makes before the
+# workers fork
+def watch_datasets():
+    if not conf['reloadInterval'] or not loaded.is_set():
+        return None
+    if request.environ.get('cob.warmup'):
+        return None
+    with watcher['lock']:
+        if watcher['pid'] != os.getpid():
+            watcher['pid'] = os.getpid()
+            threading.Thread(target=watchDatasets, daemon=True).start()
+    return None
+
+
+@app.before_request
+# Summarize the terms while serving requests, once they're loaded, only the
+# process that claims the table does the work (not the master warming caches)
+def summarize_terms():
+    if termStats is None or not loaded.is_set():
+        return None
+    if request.environ.get('cob.warmup'):
+        return None
+    with summarizer['lock']:
+        if summarizer['pid'] != os.getpid():
+            summarizer['pid'] = os.getpid()
+            threading.Thread(target=summarizeTerms, daemon=True).start()
+    return None
+
+
+@app.errorhandler(Busy)
+# Too many heavy requests on the network, come back in a bit
+def busy(e):
+    resp = jsonify({'busy': e.key})
+    resp.status_code = 503
+    resp.headers['Retry-After'] = '5'
+    return resp
+
+
+@app.route('/health')
+# The server is up and answering requests
+def health():
+    return jsonify({'status': 'ok'})
+
+
+@app.route('/ready')
+# Whether all of the datasets are loaded, with the state of each one
+def ready():
+    resp = jsonify({'ready': loaded.is_set(), 'datasets': status})
+    if not loaded.is_set():
+        resp.status_code = 503
+    return resp
+
+
 @app.route('/')
 # Sends off the homepage
 def index():
@@ -361,6 +961,36 @@ def send_static(path):
         return send_from_directory('static', path)
 
 
+@app.route('/metrics')
+# Sends the aggregated request metrics in Prometheus text format
+def send_metrics():
+    return Response(
+        metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/debug/memory')
+# Reports the memory held by each dataset and cache of this process, with the
+# allocation sites that grew the most since the last call while tracing
+def debug_memory():
+    if not conf['adminToken']:
+        abort(404)
+    if not isAdmin():
+        abort(403)
+    trace = request.args.get('trace')
+    frames = boundedArg('frames', 1, 1, 25)
+    top = boundedArg('top', 20, 1, 100)
+    with traces['lock']:
+        if trace == 'start' and not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        elif trace == 'stop' and tracemalloc.is_tracing():
+            tracemalloc.stop()
+            traces['snapshot'] = None
+        report = memoryReport()
+        if tracemalloc.is_tracing():
+            report['tracemalloc'] = traceReport(top)
+    return jsonify(report)
+
+
 @app.route("/available_datasets/<path:type>")
 # Route for sending the avalible datasets in a general fashion
 def available_datasets(type=None, *args):
@@ -380,7 +1010,14 @@ def available_datasets(type=None, *args):
 @app.route("/available_networks")
 # Route for sending the available networks
 def available_networks():
-    return jsonify({'data': network_info})
+    return jsonify({
+        'data':
+        network_info,
+        'loading': [
+            name for name, state in status['networks'].items()
+            if state in ('waiting', 'loading')
+        ]
+    })
 
 
 @app.route("/available_ontologies/<path:network>")
@@ -392,13 +1029,24 @@ def available_ontologies(network):
 @app.route("/available_terms/<path:network>/<path:ontology>")
 # Route for sending the available terms
 def available_terms(network, ontology):
-    return jsonify({'data': terms[ontology]})
+    if termStats is None:
+        return jsonify({'data': terms[ontology]})
+
+    # Along with the summaries of the terms found so far
+    stats = termStats.get(network, ontology)
+    blank = {x: None for x in termstats.COLUMNS}
+    return jsonify({
+        'data': [
+            dict(term, **stats.get(term['name'], blank))
+            for term in terms[ontology]
+        ]
+    })
 
 
 @app.route("/available_genes/<path:network>")
 # Route for sending available gene names in the network
 def available_genes(network):
-    return jsonify({'geneIDs': network_genes[network]})
+    return jsonify({'geneIDs': network_data[network]['genes']})
 
 
 @app.route("/fdr_options/<path:network>/<path:ontology>")
@@ -422,62 +1070,318 @@ def fdr_options(network, ontology):
 
 
 @app.route("/term_network", methods=['POST'])
+@heavy
 # Route for sending the CoEx Network Data for graphing from prebuilt term
 def term_network():
-    # Get data from the form and derive some stuff
-    cob = networks[str(request.form['network'])]
+    net, edges = buildTermNetwork(request.form)
+    with metrics.stage('edges'):
+        net['edges'] = edgeObjects(*edges)
+
+    # Lay it out ahead of time for the site, if asked to
+    if request.form.get('layout') == 'polywas':
+        with metrics.stage('layout'):
+            net['layout'] = polywasLayout('term_network', request.form,
+                                          net['nodes'], edges)
+
+    # Return it as a JSON object
+    with metrics.stage('jsonify'):
+        return jsonify(net)
+
+
+@app.route("/custom_network", methods=['POST'])
+@heavy
+def custom_network():
+    net, edges = buildCustomNetwork(request.form)
+    with metrics.stage('edges'):
+        net['edges'] = edgeObjects(*edges)
+
+    # Lay it out ahead of time for the site, if asked to
+    if request.form.get('layout') == 'polywas':
+        with metrics.stage('layout'):
+            net['layout'] = polywasLayout('custom_network', request.form,
+                                          net['nodes'], edges)
+
+    with metrics.stage('jsonify'):
+        return jsonify(net)
+
+
+@app.route("/export/<path:fmt>", methods=['POST'])
+# Route for streaming a network as a file. Takes the same form as /term_network
+# (with a term) or /custom_network (with a geneList) and streams what they
+# build, or the data of the gene nodes and the sources, targets and weights of
+# the edges of a graph edited on the site as JSON
+def export_network(fmt):
+    if fmt not in export.formats:
+        abort(404)
+    if 'nodes' in request.form:
+        nodes, edges = postedGraph(request.form)
+    else:
+        build = (buildTermNetwork
+                 if 'term' in request.form else buildCustomNetwork)
+        with admission.slot(request.form['network']):
+            net, edges = build(request.form)
+        nodes = (node for node in net['nodes'].values()
+                 if node['data']['render'])
+
+    # Name it like the site does
+    name = '{}.{}.{}'.format(
+        request.form.get('network', 'Network'),
+        request.form.get('term') or 'Custom', export.formats[fmt][2])
+    return Response(
+        stream_with_context(export.formats[fmt][0](nodes, edges)),
+        mimetype=export.formats[fmt][1],
+        headers={'Content-Disposition': 'attachment; filename=' + name})
+
+
+@app.route("/compare_networks", methods=['POST'])
+@heavy
+# Route for comparing the candidates of a term across every network that shares
+# the RefGen of the ontology
+def compare_networks():
+    # Get data from the form
     ontology = onts[str(request.form['ontology'])]
     term = str(request.form['term'])
-    nodeCutoff = safeOpts('nodeCutoff', request.form['nodeCutoff'])
     edgeCutoff = safeOpts('edgeCutoff', request.form['edgeCutoff'])
     windowSize = safeOpts('windowSize', request.form['windowSize'])
     flankLimit = safeOpts('flankLimit', request.form['flankLimit'])
-    hpo = (request.form['hpo'].lower().strip() == 'true')
     strongestSNPs = (
         request.form['overlapSNPs'].lower().strip() == 'strongest')
     overlapDensity = (
         request.form['overlapMethod'].lower().strip() == 'density')
-
-    # Detrmine if there is a FDR cutoff or not
     try:
-        float(request.form['fdrCutoff'])
-    except ValueError:
-        fdrCutoff = None
-    else:
         fdrCutoff = safeOpts('fdrCutoff', float(request.form['fdrCutoff']))
+    except (KeyError, ValueError):
+        fdrCutoff = None
 
-    # Get the candidates
-    cob.set_sig_edge_zscore(edgeCutoff)
-    # Check to see if Genes are HPO
-    if hpo:
-        genes = cob.refgen[gwas_data_db[
-            ontology.name].high_priority_candidates().query(
-                'COB=="{}" and Ontology == "{}" and Term == "{}"'.format(
-                    cob.name, ontology.name, term)).gene.unique()]
-    else:
-        # Get candidates based on options
-        if (strongestSNPs):
+    # The loaded networks built on the same RefGen as the ontology
+    names = [
+        name for name, cob in list(networks.items())
+        if cob._global('parent_refgen') == ontology.refgen.name
+    ]
+    if len(names) == 0:
+        abort(400)
+
+    # The genomic search is the same for all of them, so only do it once
+    with metrics.stage('candidates'):
+        genes = termCandidates(networks[names[0]], ontology, term, False,
+                               strongestSNPs, windowSize, flankLimit)
+    ids = [gene.id for gene in genes]
+
+    # Score the candidates in the networks concurrently
+    jobs = [compareJob(name, ids, edgeCutoff, 10) for name in names]
+    pool = comparePool()
+    with metrics.stage('compare'):
+        results = None
+        if pool is not None:
             try:
-                loci = ontology[term].strongest_loci(
-                    window_size=windowSize,
-                    attr=ontology.get_strongest_attr(),
-                    lowest=ontology.get_strongest_higher())
-            except KeyError:
-                loci = ontology[term].effective_loci(window_size=windowSize)
+                results = pool.map(compare.compare_network, jobs)
+            except ValueError:
+                # A reload closed the pool since we got it
+                pass
+        if results is None:
+            results = [
+                compare.compare_network(job, networks[job[0]],
+                                        adjacencyFor(networks[job[0]],
+                                                     edgeCutoff))
+                for job in jobs
+            ]
+    results = [
+        compareResult(res, ontology.name, term, edgeCutoff, windowSize,
+                      flankLimit, strongestSNPs, overlapDensity, fdrCutoff)
+        for res in results
+    ]
+
+    # The hubs that show up in more than one network
+    hubs = Counter(hub['id'] for res in results for hub in res['hubs'])
+    return jsonify({
+        'ontology': ontology.name,
+        'term': term,
+        'candidates': len(ids),
+        'networks': results,
+        'sharedHubs': [gene for gene, count in hubs.items() if count > 1]
+    })
+
+
+@app.route("/gene_connections", methods=['POST'])
+def gene_connections():
+    # Get data from the form
+    cob = networks[str(request.form['network'])]
+    edgeCutoff = safeOpts('edgeCutoff', float(request.form['edgeCutoff']))
+    allGenes = str(request.form['allGenes'])
+    newGenes = str(request.form['newGenes'])
+    allGenes = list(
+        filter((lambda x: x != ''), re.split('\r| |,|;|\t|\n', allGenes)))
+    newGenes = list(
+        filter((lambda x: x != ''), re.split('\r| |,|;|\t|\n', newGenes)))
+
+    # Without new genes, all of the edges between the genes are wanted
+    if (len(newGenes) == 0):
+        newGenes = allGenes
+
+    # Only the edges touching the new genes need to be computed
+    adj = adjacencyFor(cob, edgeCutoff)
+    with metrics.stage('edges'):
+        if adj is not None:
+            edges = edgeObjects(*adj.block(newGenes, allGenes, edgeCutoff))
         else:
-            loci = ontology[term].effective_loci(window_size=windowSize)
+            edges = edgeObjects(
+                *block_edges(cob, newGenes, allGenes, edgeCutoff))
 
-        # Find the genes
-        genes = cob.refgen.candidate_genes(
-            loci,
-            window_size=windowSize,
-            flank_limit=flankLimit,
-            chain=True,
-            include_parent_locus=True,
-            #include_parent_attrs=['numIterations', 'avgEffectSize'],
-            include_num_intervening=True,
-            include_rank_intervening=True,
-            include_num_siblings=True)
+    # Return it as a JSON object
+    return jsonify({'edges': edges})
+
+
+@app.route("/edge_cutoff", methods=['POST'])
+# Route for refiltering the edges of an already loaded network at a new cutoff
+def edge_cutoff():
+    # Get data from the form
+    cob = networks[str(request.form['network'])]
+    edgeCutoff = safeOpts('edgeCutoff', float(request.form['edgeCutoff']))
+    genes = list(
+        filter((lambda x: x != ''),
+               re.split('\r| |,|;|\t|\n', str(request.form['genes']))))
+    renderGenes = list(
+        filter((lambda x: x != ''),
+               re.split('\r| |,|;|\t|\n',
+                        str(request.form.get('renderGenes', '')))))
+
+    # Find the edges among the rendered genes, and the degree within all
+    index = edgeIndex(cob, genes)
+    with metrics.stage('edges'):
+        edges = edgeObjects(
+            *index.edges(edgeCutoff, renderGenes if renderGenes else None))
+        ldegree = index.degree(edgeCutoff)
+
+    # Return it as a JSON object
+    return jsonify({'edges': edges, 'ldegree': ldegree})
+
+
+@app.route("/gene_word_search", methods=['POST'])
+def gene_word_search():
+    cob = networks[str(request.form['network'])]
+    pCutoff = safeOpts('pCutoff', float(request.form['pCutoff']))
+    geneList = str(request.form['geneList'])
+    geneList = list(
+        filter((lambda x: x != ''), re.split('\r| |,|;|\t|\n', geneList)))
+
+    # Run the analysis and return the JSONified results
+    if hasGWS and (cob._global('parent_refgen') in func_data_db):
+        with metrics.stage('enrichment'):
+            results = geneWordSearch(
+                geneList, cob._global('parent_refgen'), minChance=pCutoff)
+    else:
+        abort(405)
+    if len(results[0]) == 0:
+        abort(400)
+    results = WordFreq.to_JSON_array(results[0])
+    return jsonify(result=results)
+
+
+@app.route("/go_enrichment", methods=['POST'])
+def go_enrichment():
+    cob = networks[str(request.form['network'])]
+    pCutoff = safeOpts('pCutoff', float(request.form['pCutoff']))
+    minTerm = safeOpts('minTerm', int(request.form['minTerm']))
+    maxTerm = safeOpts('maxTerm', int(request.form['maxTerm']))
+    geneList = str(request.form['geneList'])
+
+    # Parse the genes
+    geneList = list(
+        filter((lambda x: x != ''), re.split('\r| |,|;|\t|\n', geneList)))
+
+    # Get the things for enrichment
+    genes = cob.refgen.from_ids(geneList)
+    if cob._global('parent_refgen') in GOnt_db:
+        gont = GOnt_db[cob._global('parent_refgen')]
+    else:
+        abort(405)
+
+    # Run the enrichment
+    cob.log('Running GO Enrichment...')
+    with metrics.stage('enrichment'):
+        enr = gont.enrichment(
+            genes,
+            pval_cutoff=pCutoff,
+            min_term_size=minTerm,
+            max_term_size=maxTerm)
+    if len(enr) == 0:
+        abort(400)
+
+    # Extract the results for returning
+    terms = []
+    for term in enr:
+        terms.append({
+            'id': term.id,
+            'pval': term.attrs['pval'],
+            'name': term.name,
+            'desc': term.desc
+        })
+    df = pd.DataFrame(terms).drop_duplicates(subset='id')
+    cob.log('Found {} enriched terms.', str(df.shape[0]))
+    return jsonify(df.to_json(orient='index'))
+
+
+# --------------------------------------------
+#     Function to Make Input Safe Again
+# --------------------------------------------
+
+
+def safeOpts(name, val):
+    # Get the parameters into range
+    val = int(val) if opts[name]['int'] else float(val)
+    val = min(val, opts[name]['max'])
+    val = max(val, opts[name]['min'])
+    return val
+
+
+# --------------------------------------------
+#     Functions to get the nodes and edges
+# --------------------------------------------
+
+
+# Index the high priority candidates of an Overlap
+def indexHPO(overlap):
+    print('Indexing high priority candidates for ' + overlap.name)
+    hpo = overlap.high_priority_candidates()
+    return {
+        key: genes.unique()
+        for key, genes in hpo.groupby(
+            ['COB', 'Ontology', 'Term'], sort=False, observed=True)['gene']
+    }
+
+
+# Build the nodes and edges of a term network from the request form
+def buildTermNetwork(form):
+    # Get data from the form and derive some stuff
+    cob = networks[str(form['network'])]
+    ontology = onts[str(form['ontology'])]
+    term = str(form['term'])
+    nodeCutoff = safeOpts('nodeCutoff', form['nodeCutoff'])
+    edgeCutoff = safeOpts('edgeCutoff', form['edgeCutoff'])
+    windowSize = safeOpts('windowSize', form['windowSize'])
+    flankLimit = safeOpts('flankLimit', form['flankLimit'])
+    hpo = (form['hpo'].lower().strip() == 'true')
+    strongestSNPs = (form['overlapSNPs'].lower().strip() == 'strongest')
+    overlapDensity = (form['overlapMethod'].lower().strip() == 'density')
+
+    # Detrmine if there is a FDR cutoff or not
+    try:
+        float(form['fdrCutoff'])
+    except ValueError:
+        fdrCutoff = None
+    else:
+        fdrCutoff = safeOpts('fdrCutoff', float(form['fdrCutoff']))
+
+    # Only cutoffs missing from the degree tables need camoco to rescore
+    if tableDegrees(cob, edgeCutoff, []) is None and adjacencyFor(
+            cob, edgeCutoff) is None:
+        with metrics.stage('sigEdges'):
+            cob.set_sig_edge_zscore(edgeCutoff)
+
+    # Get the candidates, check to see if Genes are HPO
+    with metrics.stage('candidates'):
+        genes = termCandidates(cob, ontology, term, hpo, strongestSNPs,
+                               windowSize, flankLimit)
     cob.log('Found {} candidate genes', len(genes))
     # Base of the result dict
     net = {}
@@ -485,15 +1389,9 @@ def term_network():
     # If there are GWAS results, and a FDR Cutoff
     if fdrCutoff and ontology.name in gwas_data_db and not (hpo):
         cob.log('Fetching genes with FDR < {}', fdrCutoff)
-        gwas_data = gwas_data_db[ontology.name].results
-        gwas_data = gwas_data[gwas_data['COB'] == cob.name]
-        gwas_data = gwas_data[gwas_data['Term'] == term]
-        gwas_data = gwas_data[gwas_data['WindowSize'] == windowSize]
-        gwas_data = gwas_data[gwas_data['FlankLimit'] == flankLimit]
-        gwas_data = gwas_data[gwas_data['SNP2Gene'] == (
-            'strongest' if strongestSNPs else 'effective')]
-        gwas_data = gwas_data[gwas_data['Method'] == (
-            'density' if overlapDensity else 'locality')]
+        with metrics.stage('fdr'):
+            gwas_data = gwasResults(ontology.name, cob.name, term, windowSize,
+                                    flankLimit, strongestSNPs, overlapDensity)
         net['nodes'] = getNodes(
             genes,
             cob,
@@ -502,7 +1400,8 @@ def term_network():
             nodeCutoff=nodeCutoff,
             windowSize=windowSize,
             flankLimit=flankLimit,
-            fdrCutoff=fdrCutoff)
+            fdrCutoff=fdrCutoff,
+            edgeCutoff=edgeCutoff)
     else:
         # Otherwise just run it without GWAS Data
         net['nodes'] = getNodes(
@@ -512,14 +1411,17 @@ def term_network():
             nodeCutoff=nodeCutoff,
             windowSize=windowSize,
             flankLimit=flankLimit,
-            hpo=hpo)
+            hpo=hpo,
+            edgeCutoff=edgeCutoff)
 
-    # Get the edges of the nodes that will be rendered
+    # Index the edges of all the nodes, then get those that will be rendered
     render_list = []
     for node in net['nodes'].values():
         if node['data']['render']:
             render_list.append(node['data']['id'])
-    net['edges'] = getEdges(render_list, cob)
+    index = edgeIndex(cob, net['nodes'].keys())
+    with metrics.stage('edges'):
+        edges = index.edges(edgeCutoff, render_list)
 
     # Tell what enrichment options are available
     net['hasGO'] = cob._global('parent_refgen') in GOnt_db
@@ -527,28 +1429,26 @@ def term_network():
 
     # Log Data Point to COB Log
     cob.log(term + ': Found ' + str(len(net['nodes'])) + ' nodes, ' +
-            str(len(net['edges'])) + ' edges')
-
-    # Return it as a JSON object
-    return jsonify(net)
+            str(len(edges[0])) + ' edges')
+    return net, edges
 
 
-@app.route("/custom_network", methods=['POST'])
-def custom_network():
+# Build the nodes and edges of a custom network from the request form
+def buildCustomNetwork(form):
     # Get data from the form
-    cob = networks[str(request.form['network'])]
-    nodeCutoff = safeOpts('nodeCutoff', int(request.form['nodeCutoff']))
-    edgeCutoff = safeOpts('edgeCutoff', float(request.form['edgeCutoff']))
-    geneList = str(request.form['geneList'])
+    cob = networks[str(form['network'])]
+    nodeCutoff = safeOpts('nodeCutoff', int(form['nodeCutoff']))
+    edgeCutoff = safeOpts('edgeCutoff', float(form['edgeCutoff']))
+    geneList = str(form['geneList'])
 
     # Detrmine if we want neighbors or not
     try:
-        int(request.form['visNeighbors'])
+        int(form['visNeighbors'])
     except ValueError:
         visNeighbors = None
     else:
         visNeighbors = safeOpts('visNeighbors',
-                                int(request.form['visNeighbors']))
+                                int(form['visNeighbors']))
 
     # Make sure there aren't too many genes
     geneList = list(
@@ -558,64 +1458,35 @@ def custom_network():
     elif len(geneList) > geneLimit['max']:
         geneList = geneList[:geneLimit['max']]
 
-    # Set the edge score
-    cob.set_sig_edge_zscore(edgeCutoff)
+    # Set the edge score, unless the sparse adjacency can answer everything
+    if adjacencyFor(cob, edgeCutoff) is None:
+        with metrics.stage('sigEdges'):
+            cob.set_sig_edge_zscore(edgeCutoff)
 
     # Get the genes
     cob.log("Getting Neighbors")
-    primary = set()
-    neighbors = set()
-    render = set()
-    rejected = set(geneList)
-    for name in copy.copy(rejected):
-        # Find all the neighbors, sort by score
-        try:
-            gene = cob.refgen.from_id(name)
-        except ValueError:
-            continue
-
-        # Add this gene to the requisite lists
-        rejected.remove(name)
-        primary.add(gene.id)
-        render.add(gene.id)
-
-        if visNeighbors is not None:
-            # Get the neighbors from Camoco
-            nbs = cob.neighbors(
-                gene, names_as_index=False,
-                names_as_cols=True).sort_values('score')
-
-            # Strip everything except the gene IDs and add to the grand neighbor list
-            new_genes = list(set(nbs['gene_a']).union(set(nbs['gene_b'])))
-
-            # Build the set of genes that should be rendered
-            nbs = nbs[:visNeighbors]
-            render = render.union(set(nbs.gene_a).union(set(nbs.gene_b)))
-
-            # Remove the query gene if it's present
-            if gene.id in new_genes:
-                new_genes.remove(gene.id)
-
-            # Add to the set of neighbor genes
-            neighbors = neighbors.union(set(new_genes))
+    with metrics.stage('neighbors'):
+        primary, neighbors, render, rejected = customNeighbors(
+            cob, geneList, visNeighbors, edgeCutoff)
 
     # Get gene objects from IDs, but save list both lists for later
     genes_set = primary.union(neighbors)
-    genes = cob.refgen.from_ids(genes_set)
+    with metrics.stage('candidates'):
+        genes = cob.refgen.from_ids(genes_set)
 
-    # Get the candidates
-    genes = cob.refgen.candidate_genes(
-        genes,
-        window_size=0,
-        flank_limit=0,
-        chain=True,
-        include_parent_locus=True,
-        #include_parent_attrs=['numIterations', 'avgEffectSize'],
-        include_num_intervening=True,
-        include_rank_intervening=True,
-        include_num_siblings=True)
-    # Filter the candidates down to the provided list of genes
-    genes = list(filter((lambda x: x.id in genes_set), genes))
+        # Get the candidates
+        genes = cob.refgen.candidate_genes(
+            genes,
+            window_size=0,
+            flank_limit=0,
+            chain=True,
+            include_parent_locus=True,
+            #include_parent_attrs=['numIterations', 'avgEffectSize'],
+            include_num_intervening=True,
+            include_rank_intervening=True,
+            include_num_siblings=True)
+        # Filter the candidates down to the provided list of genes
+        genes = list(filter((lambda x: x.id in genes_set), genes))
 
     # If there are no good genes, error out
     if (len(genes) <= 0):
@@ -629,15 +1500,18 @@ def custom_network():
         'custom',
         primary=primary,
         render=render,
-        nodeCutoff=nodeCutoff)
+        nodeCutoff=nodeCutoff,
+        edgeCutoff=edgeCutoff)
     net['rejected'] = list(rejected)
 
-    # Get the edges of the nodes that will be rendered
+    # Index the edges of all the nodes, then get those that will be rendered
     render_list = []
     for node in net['nodes'].values():
         if node['data']['render']:
             render_list.append(node['data']['id'])
-    net['edges'] = getEdges(render_list, cob)
+    index = edgeIndex(cob, net['nodes'].keys())
+    with metrics.stage('edges'):
+        edges = index.edges(edgeCutoff, render_list)
 
     # Tell what enrichment options are available
     net['hasGO'] = cob._global('parent_refgen') in GOnt_db
@@ -645,119 +1519,243 @@ def custom_network():
 
     # Log Data Point to COB Log
     cob.log('Custom Term: Found ' + str(len(net['nodes'])) + ' nodes, ' +
-            str(len(net['edges'])) + ' edges')
-
-    return jsonify(net)
-
-
-@app.route("/gene_connections", methods=['POST'])
-def gene_connections():
-    # Get data from the form
-    cob = networks[str(request.form['network'])]
-    edgeCutoff = safeOpts('edgeCutoff', float(request.form['edgeCutoff']))
-    allGenes = str(request.form['allGenes'])
-    newGenes = str(request.form['newGenes'])
-    allGenes = list(
-        filter((lambda x: x != ''), re.split('\r| |,|;|\t|\n', allGenes)))
-    newGenes = set(
-        filter((lambda x: x != ''), re.split('\r| |,|;|\t|\n', newGenes)))
-
-    # Set the Significant Edge Score
-    cob.set_sig_edge_zscore(edgeCutoff)
-
-    # Get the edges!
-    edges = getEdges(allGenes, cob)
-
-    # Filter the ones that are not attached to the new one
-    if (len(newGenes) > 0):
-        edges = list(
-            filter(
-                lambda x: ((x['data']['source'] in newGenes) or (x['data']['target'] in newGenes)),
-                edges))
-
-    # Return it as a JSON object
-    return jsonify({'edges': edges})
-
-
-@app.route("/gene_word_search", methods=['POST'])
-def gene_word_search():
-    cob = networks[str(request.form['network'])]
-    pCutoff = safeOpts('pCutoff', float(request.form['pCutoff']))
-    geneList = str(request.form['geneList'])
-    geneList = list(
-        filter((lambda x: x != ''), re.split('\r| |,|;|\t|\n', geneList)))
-
-    # Run the analysis and return the JSONified results
-    if hasGWS and (cob._global('parent_refgen') in func_data_db):
-        results = geneWordSearch(
-            geneList, cob._global('parent_refgen'), minChance=pCutoff)
+            str(len(edges[0])) + ' edges')
+    return net, edges
+
+
+# The Overlap results of a term in a network for the search options
+def gwasResults(ontology, network, term, windowSize, flankLimit, strongestSNPs,
+                overlapDensity):
+    gwas_data = gwas_data_db[ontology].results
+    gwas_data = gwas_data[gwas_data['COB'] == network]
+    gwas_data = gwas_data[gwas_data['Term'] == term]
+    gwas_data = gwas_data[gwas_data['WindowSize'] == windowSize]
+    gwas_data = gwas_data[gwas_data['FlankLimit'] == flankLimit]
+    gwas_data = gwas_data[gwas_data['SNP2Gene'] == (
+        'strongest' if strongestSNPs else 'effective')]
+    gwas_data = gwas_data[gwas_data['Method'] == (
+        'density' if overlapDensity else 'locality')]
+    return gwas_data
+
+
+# Size of the network a term renders at the default options, found the same
+# way buildTermNetwork does but without filling the request caches
+def summarizeTerm(cob, ontology, term):
+    strongestSNPs = dflt['overlapSNPs'] == 'strongest'
+    overlapDensity = dflt['overlapMethod'] == 'density'
+    fdrCutoff = dflt['fdrCutoff'] if dflt['fdrFilter'] else None
+    genes = searchCandidates(cob.refgen, ontology, term, strongestSNPs,
+                             dflt['windowSize'], dflt['flankLimit'])
+    ids = [gene.id for gene in genes if gene.id in cob._expr_index]
+
+    # Local degree among all the candidates
+    adj = adjacencyFor(cob, dflt['edgeCutoff'])
+    if adj is not None:
+        edges = adj.edges(ids, dflt['edgeCutoff'])
     else:
-        abort(405)
-    if len(results[0]) == 0:
-        abort(400)
-    results = WordFreq.to_JSON_array(results[0])
-    return jsonify(result=results)
+        edges = subset_edges(cob, ids, dflt['edgeCutoff'])
+    ldegree = Counter(chain(edges[0].tolist(), edges[1].tolist()))
+
+    # The lowest FDR of each gene, for the FDR filter
+    fdr = {}
+    if ontology.name in gwas_data_db:
+        results = gwasResults(ontology.name, cob.name, term,
+                              dflt['windowSize'], dflt['flankLimit'],
+                              strongestSNPs, overlapDensity)
+        fdr = results.groupby('gene', observed=True)['fdr'].min().to_dict()
+
+    # The genes that would be rendered, and the edges among them
+    rendered = [
+        x for x in ids if ldegree[x] >= dflt['nodeCutoff'] and
+        (not fdrCutoff or not fdr or fdr.get(x, np.nan) <= fdrCutoff)
+    ]
+    member = set(rendered)
+    keep = [a in member and b in member for a, b in zip(*edges[:2])]
+    return {
+        'nodes': len(rendered),
+        'edges': int(np.sum(keep)),
+        'density': density(cob, rendered),
+        'minFDR': float(min(fdr.values())) if fdr else None
+    }
 
 
-@app.route("/go_enrichment", methods=['POST'])
-def go_enrichment():
-    cob = networks[str(request.form['network'])]
-    pCutoff = safeOpts('pCutoff', float(request.form['pCutoff']))
-    minTerm = safeOpts('minTerm', int(request.form['minTerm']))
-    maxTerm = safeOpts('maxTerm', int(request.form['maxTerm']))
-    geneList = str(request.form['geneList'])
+# Get the pool for comparing networks, None to compare them here instead. The
+# workers come from a fork server rather than this threaded process, so they
+# don't inherit its locks, and open the networks themselves.
+def comparePool():
+    global compare_pool
+    if conf['compareWorkers'] < 1 or not loaded.is_set():
+        return None
+    with compare_lock:
+        if compare_pool is None:
+            ctx = multiprocessing.get_context('forkserver')
+            ctx.set_forkserver_preload(['cob.compare'])
+            compare_pool = ctx.Pool(conf['compareWorkers'])
+    return compare_pool
+
+
+# The job for comparing the candidates in a network on the pool
+def compareJob(name, ids, edgeCutoff, numHubs):
+    adj = adjacencyFor(networks[name], edgeCutoff)
+    if adj is None or adj.folder is None:
+        return (name, ids, edgeCutoff, None, None, numHubs)
+    return (name, ids, edgeCutoff, adj.folder, adj.min_cutoff, numHubs)
+
+
+# Fill in the global degree of the hubs and the Overlap results of a network's
+# comparison, from the tables held here
+def compareResult(res, ontology, term, edgeCutoff, windowSize, flankLimit,
+                  strongestSNPs, overlapDensity, fdrCutoff):
+    name = res['network']
+    ids = [gene for gene, count in res['hubs']]
+    gdegree = tableDegrees(networks[name], edgeCutoff, ids)
+    adj = adjacencyFor(networks[name], edgeCutoff)
+    if gdegree is None and adj is not None:
+        gdegree = adj.degree(edgeCutoff, ids)
+    res['hubs'] = [{
+        'id': gene,
+        'ldegree': count,
+        'gdegree': None if gdegree is None else gdegree.get(gene)
+    } for gene, count in res['hubs']]
+
+    # How the candidates fared in the Overlap results
+    res['fdr'] = None
+    if ontology in gwas_data_db:
+        results = gwasResults(ontology, name, term, windowSize, flankLimit,
+                              strongestSNPs, overlapDensity)
+        res['fdr'] = {
+            'genes': int(results['gene'].nunique()),
+            'significant': None,
+            'min': None
+        }
+        if len(results):
+            res['fdr']['min'] = float(results['fdr'].min())
+        if fdrCutoff is not None:
+            res['fdr']['significant'] = int(
+                results[results['fdr'] <= fdrCutoff]['gene'].nunique())
+    return res
+
+
+# Find the Polywas layout of the rendered nodes, reusing that of the same query
+def polywasLayout(route, form, nodes, edges):
+    key = (route, ) + tuple(sorted(form.items()))
+    # As many SNP levels as the site has colors for
+    snpLevels = boundedArg('snpLevels', 3, 1, 5, form)
+    return layout_cache.fetch(
+        key, lambda: layout.polywas(
+            [node for node in nodes.values() if node['data']['render']],
+            edges,
+            width=float(form['layoutWidth']),
+            height=float(form['layoutHeight']),
+            node_diameter=safeOpts('nodeSize', form['nodeSize']),
+            log_spacing=(form['logSpacing'].lower().strip() == 'true'),
+            snp_levels=snpLevels))
+
+
+# Look up the high priority candidates
+def hpoGenes(ontology, network, term):
+    return hpo_index.get(ontology, {}).get((network, ontology, term),
+                                           np.array([]))
+
+
+# Find the candidate genes for a term given the options
+def termCandidates(cob, ontology, term, hpo, strongestSNPs, windowSize,
+                   flankLimit):
+    if hpo:
+        return cob.refgen[hpoGenes(ontology.name, cob.name, term)]
+
+    # The genomic search only depends on these, reuse it when possible
+    key = (cob.refgen.name, ontology.name, term, windowSize, flankLimit,
+           strongestSNPs)
+    return list(
+        candidate_cache.fetch(
+            key, lambda: searchCandidates(cob.refgen, ontology, term,
+                                          strongestSNPs, windowSize,
+                                          flankLimit)))
+
+
+# Search the genome for the candidate genes of a term
+def searchCandidates(refgen, ontology, term, strongestSNPs, windowSize,
+                     flankLimit):
+    # Get candidates based on options
+    if (strongestSNPs):
+        try:
+            loci = ontology[term].strongest_loci(
+                window_size=windowSize,
+                attr=ontology.get_strongest_attr(),
+                lowest=ontology.get_strongest_higher())
+        except KeyError:
+            loci = ontology[term].effective_loci(window_size=windowSize)
+    else:
+        loci = ontology[term].effective_loci(window_size=windowSize)
+
+    # Find the genes, all of the loci at once with the interval index
+    if refgen.name in gene_intervals:
+        return gene_intervals[refgen.name].candidate_genes(
+            refgen, loci, window_size=windowSize, flank_limit=flankLimit)
+    return refgen.candidate_genes(
+        loci,
+        window_size=windowSize,
+        flank_limit=flankLimit,
+        chain=True,
+        include_parent_locus=True,
+        #include_parent_attrs=['numIterations', 'avgEffectSize'],
+        include_num_intervening=True,
+        include_rank_intervening=True,
+        include_num_siblings=True)
 
-    # Parse the genes
-    geneList = list(
-        filter((lambda x: x != ''), re.split('\r| |,|;|\t|\n', geneList)))
 
-    # Get the things for enrichment
-    genes = cob.refgen.from_ids(geneList)
-    if cob._global('parent_refgen') in GOnt_db:
-        gont = GOnt_db[cob._global('parent_refgen')]
-    else:
-        abort(405)
+# Find the query genes and their neighbors for a custom network
+def customNeighbors(cob, geneList, visNeighbors, edgeCutoff):
+    adj = adjacencyFor(cob, edgeCutoff)
+    primary = set()
+    neighbors = set()
+    render = set()
+    rejected = set(geneList)
+    for name in copy.copy(rejected):
+        # Find all the neighbors, sort by score
+        try:
+            gene = cob.refgen.from_id(name)
+        except ValueError:
+            continue
 
-    # Run the enrichment
-    cob.log('Running GO Enrichment...')
-    enr = gont.enrichment(
-        genes,
-        pval_cutoff=pCutoff,
-        min_term_size=minTerm,
-        max_term_size=maxTerm)
-    if len(enr) == 0:
-        abort(400)
+        # Add this gene to the requisite lists
+        rejected.remove(name)
+        primary.add(gene.id)
+        render.add(gene.id)
 
-    # Extract the results for returning
-    terms = []
-    for term in enr:
-        terms.append({
-            'id': term.id,
-            'pval': term.attrs['pval'],
-            'name': term.name,
-            'desc': term.desc
-        })
-    df = pd.DataFrame(terms).drop_duplicates(subset='id')
-    cob.log('Found {} enriched terms.', str(df.shape[0]))
-    return jsonify(df.to_json(orient='index'))
+        if visNeighbors is not None and adj is not None:
+            # Get the neighbors from the adjacency, sorted by score
+            if gene.id in adj.index:
+                ids, scores = adj.neighbors(gene.id, edgeCutoff)
+            else:
+                ids, scores = np.array([]), np.array([])
+            order = np.argsort(scores, kind='stable')
 
+            # Render the first few, add all of them to the neighbors
+            render = render.union(ids[order[:visNeighbors]].tolist())
+            neighbors = neighbors.union(ids.tolist())
+        elif visNeighbors is not None:
+            # Get the neighbors from Camoco
+            nbs = cob.neighbors(
+                gene, names_as_index=False,
+                names_as_cols=True).sort_values('score')
 
-# --------------------------------------------
-#     Function to Make Input Safe Again
-# --------------------------------------------
+            # Strip everything except the gene IDs and add to the grand neighbor list
+            new_genes = list(set(nbs['gene_a']).union(set(nbs['gene_b'])))
 
+            # Build the set of genes that should be rendered
+            nbs = nbs[:visNeighbors]
+            render = render.union(set(nbs.gene_a).union(set(nbs.gene_b)))
 
-def safeOpts(name, val):
-    # Get the parameters into range
-    val = int(val) if opts[name]['int'] else float(val)
-    val = min(val, opts[name]['max'])
-    val = max(val, opts[name]['min'])
-    return val
+            # Remove the query gene if it's present
+            if gene.id in new_genes:
+                new_genes.remove(gene.id)
 
+            # Add to the set of neighbor genes
+            neighbors = neighbors.union(set(new_genes))
 
-# --------------------------------------------
-#     Functions to get the nodes and edges
-# --------------------------------------------
+    return primary, neighbors, render, rejected
 
 
 def getNodes(genes,
@@ -770,24 +1768,27 @@ def getNodes(genes,
              windowSize=None,
              flankLimit=None,
              fdrCutoff=None,
-             hpo=False):
+             hpo=False,
+             edgeCutoff=None):
     # Cache the locality
-    locality = cob.locality(genes)
+    with metrics.stage('locality'):
+        ldegrees, gdegrees = geneDegrees(cob, genes, edgeCutoff)
 
     # Containers for the node info
     nodes = {}
     parent_set = set()
 
     # Look for alises
-    aliases = co.RefGen(cob._global('parent_refgen')).aliases(
-        [gene.id for gene in genes])
-
-    # Look for annotations
-    if cob._global('parent_refgen') in func_data_db:
-        func_data = func_data_db[cob._global('parent_refgen')].get_annotations(
+    with metrics.stage('annotations'):
+        aliases = co.RefGen(cob._global('parent_refgen')).aliases(
             [gene.id for gene in genes])
-    else:
-        func_data = {}
+
+        # Look for annotations
+        if cob._global('parent_refgen') in func_data_db:
+            func_data = func_data_db[cob._global(
+                'parent_refgen')].get_annotations([gene.id for gene in genes])
+        else:
+            func_data = {}
 
     # Pre cache a list of the contained genes
     gwasDataGenes = set()
@@ -796,10 +1797,10 @@ def getNodes(genes,
 
     for gene in genes:
         # Catch for translating the way camoco works to the way We need for COB
-        try:
-            ldegree = locality.ix[gene.id]['local']
-            gdegree = locality.ix[gene.id]['global']
-        except KeyError as e:
+        if gene.id in ldegrees:
+            ldegree = ldegrees[gene.id]
+            gdegree = gdegrees[gene.id]
+        else:
             ldegree = gdegree = 'nan'
 
         # Catch for bug in camoco
@@ -902,21 +1903,74 @@ def getNodes(genes,
     return nodes
 
 
-def getEdges(geneList, cob):
-    # Find the Edges for the genes we will render
-    subnet = cob.subnetwork(
-        cob.refgen.from_ids(geneList),
-        names_as_index=False,
-        names_as_cols=True)
-
-    # "Loop" to build the edge objects
-    edges = [{
+def networkData(cob):
+    # What was built for this copy of the network, None once it was replaced,
+    # so requests still running on it go through camoco rather than mixing
+    # the copies
+    data = network_data.get(cob.name)
+    if data is None or data['cob'] is not cob:
+        return None
+    return data
+
+
+def tableDegrees(cob, edgeCutoff, ids):
+    # Global degree of the genes from the degree table, None if it's missing
+    data = networkData(cob)
+    if data is None or edgeCutoff is None:
+        return None
+    return data['degreeTable'].degree(edgeCutoff, ids)
+
+
+def adjacencyFor(cob, edgeCutoff):
+    # The sparse adjacency of the network, if it holds the edges at the cutoff
+    data = networkData(cob)
+    adj = data['adjacency'] if data is not None else None
+    if adj is not None and edgeCutoff is not None and adj.covers(edgeCutoff):
+        return adj
+    return None
+
+
+def geneDegrees(cob, genes, edgeCutoff=None):
+    # Local degree from the edges among the genes, global from the table
+    ids = [gene.id for gene in genes]
+    gdegree = tableDegrees(cob, edgeCutoff, ids)
+    if gdegree is None and adjacencyFor(cob, edgeCutoff) is not None:
+        gdegree = adjacencyFor(cob, edgeCutoff).degree(edgeCutoff, ids)
+    if gdegree is None:
+        # Not a precomputed cutoff, use camoco at the network's current cutoff
+        locality = cob.locality(genes)
+        return locality['local'].to_dict(), locality['global'].to_dict()
+    return edgeIndex(cob, ids).degree(edgeCutoff), gdegree
+
+
+def edgeIndex(cob, genes):
+    # Fetch the score sorted edges of the genes, building them if needed
+    genes = frozenset(genes)
+    with metrics.stage('edgeIndex'):
+        return edge_index.fetch(
+            (cob.name, genes),
+            lambda: SortedEdges(cob, genes, opts['edgeCutoff']['min']))
+
+
+def edgeObjects(sources, targets, weights):
+    # Build the edge objects from parallel arrays
+    return [{
         'group': 'edges',
         'data': {
             'source': source,
             'target': target,
             'weight': str(weight)
         }
-    } for source, target, weight, significant, distance in subnet.itertuples(
-        index=False)]
-    return edges
+    } for source, target, weight in zip(sources.tolist(), targets.tolist(),
+                                        weights.tolist())]
+
+
+# ---------------------------------------------
+#              Load the Datasets
+# ---------------------------------------------
+# A preloaded app is forked into the workers once loaded, so it has to be done
+# up front, otherwise load in the background and start answering right away
+if conf['preload']:
+    loadDatasets()
+else:
+    threading.Thread(target=loadDatasets, daemon=True).start()
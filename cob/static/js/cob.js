@@ -25,6 +25,9 @@ var isTerm = false;
 // Saves whether data includes neighbors or not
 var hasNeighbors = true;
 
+// Whether genes were added to or removed from the graph since it was loaded
+var graphEdited = false;
+
 // Holder for the timer id of the subnet pop effect
 var popTimerID = 1;
 
@@ -330,93 +333,54 @@ $('#pngButton').click(function() {
   download(png, name + '.png', 'image/png');
 });
 
-// GraphML Button is pressed
-$('#graphMLButton').click(function() {
+// Have the server stream the network on screen as a file, by rerunning its
+// query at the current options, or from the graph itself once it was edited
+function exportNet(format) {
   if (cy === null) {
     return;
   }
 
-  // Get the graph
-  var txt = cy.graphml();
-
-  // Do some modifications to file
-  doc = $.parseXML(txt);
-
-  // Remove uncessary elements and attributes
-  $(doc)
-    .find('[id^="SNPG"], node:contains("chrom")')
-    .remove();
-  $(doc)
-    .find('data')
-    .removeAttr('type');
-
-  // Find the attribute types for nodes and edges
-  var nodeAttrs = new Set();
-  var edgeAttrs = new Set();
-  $(doc)
-    .find('node>data')
-    .each(function(idx, cur) {
-      nodeAttrs.add($(cur).attr('key'));
-    });
-  $(doc)
-    .find('edge>data')
-    .each(function(idx, cur) {
-      edgeAttrs.add($(cur).attr('key'));
+  var fields = null;
+  if (!graphEdited) {
+    fields = isTerm ? termQuery() : customQuery();
+  } else {
+    var nodes = cy.nodes(':visible[type = "gene"]').map((cur) => cur.data());
+    var edges = [[], [], []];
+    cy.edges(':visible').forEach(function(cur) {
+      edges[0].push(cur.data('source'));
+      edges[1].push(cur.data('target'));
+      edges[2].push(cur.data('weight'));
     });
-
-  // Function to find the key string
-  function setKey(key, parent) {
-    // Figure out the type of the key
-    var type = 'string';
-    var val = $(doc)
-      .find('data[key="' + key + '"]')
-      .first()
-      .text();
-    if (!isNaN(val) && val.length > 0) {
-      if (Number.isInteger(+val)) {
-        type = 'int';
-      } else {
-        type = 'double';
-      }
-    }
-
-    // Build the XML line
-    var line =
-      '<key id="' +
-      key +
-      '" for="' +
-      parent +
-      '" attr.name="' +
-      key +
-      '" attr.type="' +
-      type +
-      '"/>';
-
-    // Add it to the graph
-    $(doc)
-      .find('graph')
-      .before(line);
+    fields = {
+      network: curNetwork,
+      term: isTerm ? curTerm : '',
+      nodes: JSON.stringify(nodes),
+      edges: JSON.stringify(edges),
+    };
   }
 
-  // Add eaach of the keys to the header
-  nodeAttrs.forEach(function(cur) {
-    setKey(cur, 'node');
+  // Post them with a form, so the browser saves the response as it comes
+  var form = $('<form>', {
+    method: 'POST',
+    action: SCRIPT_ROOT + 'export/' + format,
   });
-  edgeAttrs.forEach(function(cur) {
-    setKey(cur, 'edge');
+  $.each(fields, function(key, val) {
+    form.append($('<input>', {type: 'hidden', name: key, value: val}));
   });
+  form.appendTo('body').submit().remove();
+}
 
-  // Re-Serialize the graph
-  txt = new XMLSerializer().serializeToString(doc);
+// GraphML Button is pressed
+$('#graphMLButton').click(function() {
+  exportNet('graphml');
+});
 
-  // Derive Filename
-  var name = curNetwork + '.';
-  if (isTerm) {
-    name += curTerm;
-  } else {
-    name += 'Custom';
-  }
+// Edge List Button is pressed
+$('#edgeListButton').click(function() {
+  exportNet('tsv');
+});
 
-  // Run the Download
-  download(txt, name + '.graphml', 'application/xml');
+// Node Table Button is pressed
+$('#nodeTableButton').click(function() {
+  exportNet('csv');
 });
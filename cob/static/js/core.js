@@ -113,12 +113,13 @@ function updateGraph() {
       term = false;
     }
   } else {
-    // If there is one see how full of a reload is necessary
+    // If there is one see how full of a reload is necessary, the edge cutoff
+    // also picks the neighbors and which nodes pass the degree cutoff
+    var cutoffChange = optsChange(['edgeCutoff']);
     newGraph =
       fdrFlag ||
       optsChange([
         'nodeCutoff',
-        'edgeCutoff',
         'visNeighbors',
         'windowSize',
         'flankLimit',
@@ -126,13 +127,78 @@ function updateGraph() {
         'hpo',
         'overlapSNPs',
         'overlapMethod',
-      ]);
+      ]) ||
+      (cutoffChange &&
+        (getOpt('nodeCutoff') > 0 || (!isTerm && hasNeighbors)));
     poly = isPoly();
     term = isTerm;
+
+    // Otherwise only the edges change, swap them on the current graph
+    if (!newGraph && cutoffChange) {
+      changeEdgeCutoff();
+      return;
+    }
   }
   loadGraph(newGraph, poly, term);
 }
 
+// Refilter the edges of the current graph at the new edge cutoff on the
+// server, leaving the nodes where they are
+function changeEdgeCutoff() {
+  $('.alert').addClass('hidden');
+  var badFields = checkOpts();
+  if (badFields.length > 0) {
+    errorOpts(badFields);
+    return;
+  }
+  updateOpts();
+
+  var renderGenes = cy.nodes('[type = "gene"]').map((cur) => cur.id());
+  $.ajax({
+    url: SCRIPT_ROOT + 'edge_cutoff',
+    data: {
+      network: curNetwork,
+      edgeCutoff: curOpts['edgeCutoff'],
+      genes: Object.keys(geneDict).toString(),
+      renderGenes: renderGenes.toString(),
+    },
+    type: 'POST',
+    success: function(data) {
+      cy.startBatch();
+      cy.edges().remove();
+      cy.add(data.edges);
+
+      // Update Node Degrees
+      Object.keys(geneDict).forEach(function(cur) {
+        var gene = geneDict[cur]['data'];
+        if (cur in data.ldegree) {
+          gene['ldegree'] = data.ldegree[cur].toString();
+        }
+        if (gene['render']) {
+          gene['cur_ldegree'] = cy.getElementById(cur).degree();
+        } else {
+          gene['cur_ldegree'] = 0;
+        }
+      });
+      cy.endBatch();
+
+      // Update the table and such
+      curSel = $('#GeneTable')
+        .DataTable()
+        .rows('.selected')
+        .ids(true);
+      buildGeneTables();
+      updateHUD();
+      if (curSel.length > 0) {
+        $('#GeneTable')
+          .DataTable()
+          .rows(curSel)
+          .select();
+      }
+    },
+  });
+}
+
 /*--------------------------------
      Gene Selection Function
 ---------------------------------*/
@@ -1,23 +1,29 @@
 /*----------------------------------
         Retrieve Gene Data
 -----------------------------------*/
+// The form of the term network query at the current options
+function termQuery() {
+  return {
+    network: curNetwork,
+    ontology: curOntology,
+    term: curTerm,
+    nodeCutoff: curOpts['nodeCutoff'],
+    edgeCutoff: curOpts['edgeCutoff'],
+    windowSize: curOpts['windowSize'],
+    flankLimit: curOpts['flankLimit'],
+    fdrCutoff: fdrFilter ? curOpts['fdrCutoff'] : 'None',
+    hpo: getOpt('hpo'),
+    overlapSNPs: getOpt('overlapSNPs'),
+    overlapMethod: getOpt('overlapMethod'),
+  };
+}
+
 // Pull the nodes for a specific term
 function termNet(resolve, reject, poly) {
+  var query = termQuery();
   $.ajax({
     url: SCRIPT_ROOT + 'term_network',
-    data: {
-      network: curNetwork,
-      ontology: curOntology,
-      term: curTerm,
-      nodeCutoff: curOpts['nodeCutoff'],
-      edgeCutoff: curOpts['edgeCutoff'],
-      windowSize: curOpts['windowSize'],
-      flankLimit: curOpts['flankLimit'],
-      fdrCutoff: fdrFilter ? curOpts['fdrCutoff'] : 'None',
-      hpo: getOpt('hpo'),
-      overlapSNPs: getOpt('overlapSNPs'),
-      overlapMethod: getOpt('overlapMethod'),
-    },
+    data: poly ? $.extend({}, query, getPolyQuery()) : query,
     type: 'POST',
     statusCode: {
       400: function() {
@@ -36,6 +42,7 @@ function termNet(resolve, reject, poly) {
 
       // Set some statuses
       isTerm = true;
+      graphEdited = false;
       hasGO = data.hasGO;
       hasGWS = data.hasGWS;
 
@@ -45,11 +52,31 @@ function termNet(resolve, reject, poly) {
       pastQuery = [];
 
       // Send back the nodes and edges
-      modCyto(resolve, reject, true, poly, data.nodes, data.edges);
+      modCyto(
+        resolve,
+        reject,
+        true,
+        poly,
+        data.nodes,
+        data.edges,
+        data.layout,
+      );
     },
   });
 }
 
+// The form of the custom network query at the current options
+function customQuery() {
+  return {
+    network: curNetwork,
+    hasNeighbors: hasNeighbors,
+    nodeCutoff: curOpts['nodeCutoff'],
+    edgeCutoff: curOpts['edgeCutoff'],
+    visNeighbors: hasNeighbors ? curOpts['visNeighbors'] : 'None',
+    geneList: $('#geneList').val(),
+  };
+}
+
 // Pull the nodes for a custom defined set of genes
 function customNet(resolve, reject, poly) {
   // Fail safe to pull neighbors if actually needed
@@ -58,16 +85,10 @@ function customNet(resolve, reject, poly) {
   }
 
   // Run the request!
+  var query = customQuery();
   $.ajax({
     url: SCRIPT_ROOT + 'custom_network',
-    data: {
-      network: curNetwork,
-      hasNeighbors: hasNeighbors,
-      nodeCutoff: curOpts['nodeCutoff'],
-      edgeCutoff: curOpts['edgeCutoff'],
-      visNeighbors: hasNeighbors ? curOpts['visNeighbors'] : 'None',
-      geneList: $('#geneList').val(),
-    },
+    data: poly ? $.extend({}, query, getPolyQuery()) : query,
     type: 'POST',
     statusCode: {
       400: function() {
@@ -86,6 +107,7 @@ function customNet(resolve, reject, poly) {
 
       // Set some statuses
       isTerm = false;
+      graphEdited = false;
       hasGO = data.hasGO;
       hasGWS = data.hasGWS;
 
@@ -104,7 +126,15 @@ function customNet(resolve, reject, poly) {
       pastQuery = [];
 
       // Send back the nodes and edges
-      modCyto(resolve, reject, true, poly, data.nodes, data.edges);
+      modCyto(
+        resolve,
+        reject,
+        true,
+        poly,
+        data.nodes,
+        data.edges,
+        data.layout,
+      );
     },
   });
 }
@@ -115,6 +145,7 @@ function customNet(resolve, reject, poly) {
 function addGenes(newGenes) {
   // Set the add gene mutex
   noAdd = true;
+  graphEdited = true;
 
   // Update the new genes
   var newGenesData = [];
@@ -150,6 +181,7 @@ function addGenes(newGenes) {
 }
 
 function removeGenes(genes) {
+  graphEdited = true;
   cy.startBatch();
   genes.forEach(function(cur, idx, arr) {
     geneDict[cur]['data']['render'] = false;
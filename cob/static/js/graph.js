@@ -1,7 +1,7 @@
 /*-------------------------------------
      General Modify Graph Function
 -------------------------------------*/
-function modCyto(resolve, reject, newGraph, poly, nodes, edges) {
+function modCyto(resolve, reject, newGraph, poly, nodes, edges, preset) {
   if (newGraph) {
     // Destroy the old graph if there is one
     if (cy !== null) {
@@ -27,7 +27,7 @@ function modCyto(resolve, reject, newGraph, poly, nodes, edges) {
     }
 
     // Init the graph
-    initCyto(renNodes, edges, poly);
+    initCyto(renNodes, edges, poly, preset);
   } else {
     // Run the proper layout
     var layout = null;
@@ -60,12 +60,29 @@ function modCyto(resolve, reject, newGraph, poly, nodes, edges) {
           Options for Each Layout
 ------------------------------------------*/
 // Function to return an object for the layout options
-function getPolyLayoutOpts() {
+function getPolyLayoutOpts(preset) {
   return {
     name: 'polywas',
     nodeDiameter: getOpt('nodeSize'),
     logSpacing: getOpt('logSpacing'),
     snpLevels: 5,
+    preset: preset || null,
+  };
+}
+// Function to return the options for the server to find the Polywas layout
+function getPolyQuery() {
+  var width = $('#cy').width();
+  var height = $('#cy').height();
+  if (!(width > 0 && height > 0)) {
+    return {};
+  }
+  return {
+    layout: 'polywas',
+    layoutWidth: width,
+    layoutHeight: height,
+    nodeSize: getOpt('nodeSize'),
+    logSpacing: getOpt('logSpacing'),
+    snpLevels: 5,
   };
 }
 // Function to return an object for the layout options
@@ -80,10 +97,10 @@ function getForceLayoutOpts() {
 /*------------------------------------------
           Init Cytoscape.js Fresh
 ------------------------------------------*/
-function initCyto(nodes, edges, poly) {
+function initCyto(nodes, edges, poly, preset) {
   // Get the proper layout options
   if (poly) {
-    var opts = getPolyLayoutOpts();
+    var opts = getPolyLayoutOpts(preset);
   } else {
     var opts = getForceLayoutOpts();
   }
@@ -14,6 +14,7 @@
       radWidth: 0.015, // Thickness of the chromosomes lines (in radians)
       logSpacing: false, // Log or linear SNP layout along chromosome
       snpLevels: 3, // How many colors to stripe the snps
+      preset: null, // Positions already found by the server, if any
 
       // Defines which chromosome the gene is on
       getChrom: function(ele) {
@@ -96,6 +97,13 @@
         cur.data('end', options.getEnd(cur));
       });
 
+      // Use the positions the server found, if it sent them
+      if (options.preset) {
+        placePreset(layout, options, genes);
+        cy.endBatch();
+        return finishLayout(layout, options);
+      }
+
       // ===========================
       // Find Info About Chromosomes
       // ===========================
@@ -152,21 +160,7 @@
       });
 
       // Set the chromosomes style to make the lines
-      chrom
-        .style({
-          shape: 'polygon',
-          width: function(ele) {
-            return ele.data('len');
-          },
-          height: function(ele) {
-            return ele.data('len');
-          },
-          'shape-polygon-points': function(ele) {
-            return getLinePolygon(ele);
-          },
-        })
-        .lock()
-        .unselectify();
+      styleChroms(chrom);
 
       // ===============
       // Handle the SNPs
@@ -265,17 +259,7 @@
       // ==================
       // End the batch operation
       cy.endBatch();
-
-      // Trigger layoutready when each node has had its position set at least once
-      layout.one('layoutready', options.ready);
-      layout.trigger('layoutready');
-
-      // Trigger layoutstop when the layout stops (e.g. finishes)
-      layout.one('layoutstop', options.stop);
-      layout.trigger('layoutstop');
-
-      // Done
-      return layout;
+      return finishLayout(layout, options);
     };
 
     // Called on Continuous Layouts to Stop Them Before They Finish
@@ -305,6 +289,65 @@
   }
 })();
 
+// Trigger the end of layout events
+function finishLayout(layout, options) {
+  // Trigger layoutready when each node has had its position set at least once
+  layout.one('layoutready', options.ready);
+  layout.trigger('layoutready');
+
+  // Trigger layoutstop when the layout stops (e.g. finishes)
+  layout.one('layoutstop', options.stop);
+  layout.trigger('layoutstop');
+
+  // Done
+  return layout;
+}
+
+// Set the chromosomes style to make the lines
+function styleChroms(chrom) {
+  chrom
+    .style({
+      shape: 'polygon',
+      width: function(ele) {
+        return ele.data('len');
+      },
+      height: function(ele) {
+        return ele.data('len');
+      },
+      'shape-polygon-points': function(ele) {
+        return getLinePolygon(ele);
+      },
+    })
+    .lock()
+    .unselectify();
+}
+
+// Place the chromosomes, SNP groups and genes where the server put them
+function placePreset(layout, options, genes) {
+  var cy = options.cy;
+  var preset = options.preset;
+
+  // Add the chromosomes and SNP groups, their positions come with them
+  var chrom = cy.add(preset['chroms']);
+  var snps = cy.add(preset['snpGroups']);
+
+  // Break the batch to actually add them
+  cy.endBatch();
+  cy.startBatch();
+  styleChroms(chrom);
+  snps.lock().unselectify();
+
+  // Move the genes to their spots
+  genes.layoutPositions(layout, options, function(ele, i) {
+    var gene = preset['genes'][ele.id()];
+    if (gene === undefined) {
+      return ele.position();
+    }
+    ele.addClass(gene['classes']);
+    return gene['position'];
+  });
+}
+
 // Helper function that, given a node containing theta in its data,
 // returns the polygon points for a line oriented in that direction in
 // relation to the origin (0,0) of the unit circle
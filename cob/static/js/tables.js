@@ -66,6 +66,22 @@ function buildTermTable(network, ontology) {
       {data: 'desc', name: 'desc', title: 'Desc'},
       {data: 'snps', name: 'snps', title: 'SNPs'},
       {data: 'genes', name: 'genes', title: 'Genes'},
+      {data: 'nodes', name: 'nodes', title: 'Nodes', defaultContent: '-'},
+      {data: 'edges', name: 'edges', title: 'Edges', defaultContent: '-'},
+      {
+        data: 'density',
+        name: 'density',
+        title: 'Density',
+        defaultContent: '-',
+        render: fixedRender(2),
+      },
+      {
+        data: 'minFDR',
+        name: 'minFDR',
+        title: 'Min FDR',
+        defaultContent: '-',
+        render: fixedRender(3),
+      },
     ],
     dom: '<"TermTitle">frtip',
     initComplete: function(settings, json) {
@@ -401,6 +417,16 @@ function gws(e, dt, node, config) {
   enrich(geneList, false);
 }
 
+// Show numbers to a few digits, terms not summarized yet sort last
+function fixedRender(digits) {
+  return function(data, type) {
+    if (data === null || data === undefined) {
+      return type === 'display' ? '-' : Infinity;
+    }
+    return type === 'display' ? Number(data).toFixed(digits) : data;
+  };
+}
+
 // Run GO enrichment on table
 function gont(e, dt, node, cofig) {
   // Build the gene query list
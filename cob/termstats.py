@@ -0,0 +1,91 @@
+#!/usr/bin/python3
+
+import os
+import json
+import fcntl
+import threading
+
+# Summary columns of each term, as listed with the terms
+COLUMNS = ('nodes', 'edges', 'density', 'minFDR')
+
+
+# --------------------------------------------
+#     Per Term Network Summaries in the Scratch
+# --------------------------------------------
+# The size of the network each term renders at the default options, appended
+# to a file one JSON line per (network, ontology, term) as they're found. Every
+# server process reads the lines the others added, and lines found with other
+# options are ignored, so changing the defaults starts the table over.
+class TermStats(object):
+    def __init__(self, filename, options):
+        self.filename = filename
+        self.options = options
+        self.lock = threading.Lock()
+        self.stats = {}
+        self.offset = 0
+        self.owner = None
+        os.register_at_fork(after_in_child=self._forked)
+
+    # A forked process starts over with its own lock, and the claim stays with
+    # the process that made it
+    def _forked(self):
+        self.lock = threading.Lock()
+        if self.owner is not None:
+            self.owner.close()
+            self.owner = None
+
+    # Read the lines added since the last look
+    def refresh(self):
+        with self.lock:
+            if not os.path.exists(self.filename):
+                return
+            with open(self.filename, 'rb') as fd:
+                fd.seek(self.offset)
+                for line in fd:
+                    # Stop at a line that is still being written
+                    if not line.endswith(b'\n'):
+                        break
+                    self.offset += len(line)
+                    try:
+                        row = json.loads(line.decode())
+                    except ValueError:
+                        continue
+                    if row.get('options') != self.options:
+                        continue
+                    self.stats.setdefault((row['network'], row['ontology']),
+                                          {})[row['term']] = {
+                                              x: row.get(x)
+                                              for x in COLUMNS
+                                          }
+
+    # Summaries of the terms of an ontology in a network, by term
+    def get(self, network, ontology):
+        self.refresh()
+        return self.stats.get((network, ontology), {})
+
+    def add(self, network, ontology, term, summary):
+        line = json.dumps(
+            dict(
+                summary,
+                network=network,
+                ontology=ontology,
+                term=term,
+                options=self.options))
+        with self.lock:
+            with open(self.filename, 'a') as fd:
+                fd.write(line + '\n')
+        self.refresh()
+
+    # Whether this process gets to fill in the table, only one of the server
+    # processes sharing the scratch folder does
+    def claim(self):
+        if self.owner is not None:
+            return True
+        fd = open(self.filename + '.lock', 'w')
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            fd.close()
+            return False
+        self.owner = fd
+        return True
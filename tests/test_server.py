@@ -0,0 +1,180 @@
+#!/usr/bin/python3
+
+import os
+import sys
+import copy
+import json
+import time
+import yaml
+import importlib
+import threading
+import pytest
+
+# The server runs against the synthetic camoco datasets of the benchmarks
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, 'benchmarks'), ROOT]
+import synthetic
+import bench_server
+
+
+@pytest.fixture(scope='module')
+def data():
+    data = synthetic.build_datasets(500, 10)
+    synthetic.install(data)
+    return data
+
+
+# Import a fresh copy of the server with some of the options changed
+def load_server(scratch, **options):
+    conf = dict(bench_server.CONF, scratch=str(scratch), **options)
+    os.environ['COB_CONF'] = yaml.dump(conf)
+    sys.modules.pop('cob.server', None)
+    return importlib.import_module('cob.server')
+
+
+# The form of a term network request at the defaults
+def term_form(data, term):
+    dflt = bench_server.CONF['defaults']
+    return {
+        'network': next(iter(data.networks)),
+        'ontology': next(iter(data.gwas)),
+        'term': term,
+        'nodeCutoff': dflt['nodeCutoff'],
+        'edgeCutoff': dflt['edgeCutoff'],
+        'windowSize': dflt['windowSize'],
+        'flankLimit': dflt['flankLimit'],
+        'fdrCutoff': dflt['fdrCutoff'],
+        'hpo': 'false',
+        'overlapSNPs': dflt['overlapSNPs'],
+        'overlapMethod': dflt['overlapMethod']
+    }
+
+
+# --------------------------------------------
+#     Warming the Caches in a Preloaded Master
+# --------------------------------------------
+def test_warmup_starts_nothing_before_fork(data, tmp_path):
+    gwas = next(iter(data.gwas.values()))
+    with open(tmp_path / 'requests.log', 'w') as log:
+        for term in gwas.iter_terms():
+            log.write(
+                json.dumps({
+                    'time': 0,
+                    'method': 'POST',
+                    'path': '/term_network',
+                    'form': term_form(data, term.id)
+                }) + '\n')
+    logged = (tmp_path / 'requests.log').read_text()
+
+    before = set(threading.enumerate())
+    server = load_server(
+        tmp_path,
+        preload=True,
+        warmTerms=3,
+        requestLog='requests.log',
+        termStats='term_stats.jsonl',
+        reloadInterval=60)
+
+    # The caches were warmed, without recording the requests
+    assert len(server.candidate_cache) > 0
+    assert (tmp_path / 'requests.log').read_text() == logged
+
+    # But nothing that has to run in the workers started in the master
+    assert set(threading.enumerate()) <= before
+    assert server.watcher['pid'] is None
+    assert server.summarizer['pid'] is None
+    assert server.termStats.owner is None
+
+    # The first real request starts them in the process serving it
+    server.app.test_client().get('/available_terms/{}/{}'.format(
+        next(iter(data.networks)), gwas.name))
+    assert server.watcher['pid'] == os.getpid()
+    assert server.summarizer['pid'] == os.getpid()
+
+
+# --------------------------------------------
+#     Sharing Heavy Requests
+# --------------------------------------------
+def test_heavy_keeps_route_headers(data, tmp_path):
+    server = load_server(tmp_path, preload=True)
+    calls = []
+    release = threading.Event()
+
+    def route():
+        calls.append(1)
+        release.wait(10)
+        resp = server.jsonify({'calls': len(calls)})
+        resp.headers['X-Cob-Test'] = 'kept'
+        resp.headers['Content-Disposition'] = 'attachment; filename=net.csv'
+        return resp
+
+    server.app.add_url_rule(
+        '/test_heavy',
+        'test_heavy',
+        server.heavy(route),
+        methods=['POST'])
+
+    # Identical requests made while the first one runs share its result
+    results = []
+
+    def post():
+        resp = server.app.test_client().post(
+            '/test_heavy', data={'network': 'none'})
+        results.append(resp)
+
+    threads = [threading.Thread(target=post) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    while not calls:
+        time.sleep(0.01)
+    time.sleep(0.5)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(results) == 4
+    for resp in results:
+        assert resp.status_code == 200
+        assert resp.get_json() == {'calls': 1}
+        assert resp.headers['X-Cob-Test'] == 'kept'
+        assert resp.headers['Content-Disposition'] == \
+            'attachment; filename=net.csv'
+        assert resp.mimetype == 'application/json'
+
+
+# --------------------------------------------
+#     Reloading the Datasets
+# --------------------------------------------
+def test_failed_reload_is_retried(data, tmp_path, monkeypatch):
+    server = load_server(tmp_path, preload=True)
+    name = next(iter(data.networks))
+    old = server.networks[name]
+    server.versions[('Expr', name)] = -1
+
+    # A load that fails partway leaves the old copy up, still outdated
+    def broken(name):
+        raise ValueError('Half written')
+
+    monkeypatch.setattr(server.co, 'COB', broken)
+    server.loadStep('networks', name, server.loadNetwork)
+    assert server.networks[name] is old
+    assert server.networkData(old) is not None
+    assert server.outdated('Expr', name)
+
+    # Once it loads, the new copy and what was built for it come in together
+    monkeypatch.undo()
+    cob = server.co.COB
+    monkeypatch.setattr(server.co, 'COB', lambda name: copy.copy(cob(name)))
+    server.loadStep('networks', name, server.loadNetwork)
+    assert not server.outdated('Expr', name)
+    new = server.networks[name]
+    assert new is not old
+    assert server.networkData(new)['cob'] is new
+    assert server.adjacencyFor(new, 3.0) is not None
+    assert server.tableDegrees(new, 2.5, [new._expr.index[0]]) is not None
+
+    # Requests still running on the old copy don't get the new tables
+    assert server.networkData(old) is None
+    assert server.adjacencyFor(old, 3.0) is None
+    assert server.tableDegrees(old, 2.5, [new._expr.index[0]]) is None